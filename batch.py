@@ -0,0 +1,180 @@
+"""
+Convert many Gitleaks configs to SSSIG rules in one process.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+import gitleaks
+import sssig
+import translate
+
+
+class ConfigSummary(BaseModel):
+    src: Path
+    dst: Path
+    rules: int
+    load_seconds: float
+    write_seconds: float
+    # Rules left out because they failed to translate
+    failures: list[gitleaks.RuleFailure] = []
+    # Why the config itself failed to load, in which case nothing is written
+    error: str | None = None
+
+
+class BatchSummary(BaseModel):
+    configs: list[ConfigSummary]
+    workers: int
+    total_rules: int
+    unique_rules: int
+    translate_seconds: float
+    total_seconds: float
+
+
+def find_configs(src: Path) -> list[Path]:
+    """
+    List the configs to convert.
+
+    A directory converts every *.toml in it, anything else is read as a
+    manifest with one config path per line (relative to the manifest).
+    Blank lines and lines starting with # are ignored.
+    """
+    if src.is_dir():
+        return sorted(src.glob("*.toml"))
+
+    paths = []
+    for line in src.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            paths.append(src.parent / line)
+
+    return paths
+
+
+def translate_rules(
+    rules: list[gitleaks.Rule],
+    workers: int,
+    keep_going: bool = False,
+    pool: translate.PatternPool | None = None,
+) -> list[sssig.Rule | gitleaks.RuleFailure]:
+    """
+    Translate rules, spread over a process pool when workers > 1.
+
+    Each worker keeps its own hyperscan validation cache, so patterns
+    shared by rules in the same chunk are still only validated once. With
+    keep_going a rule that fails to translate comes back as a RuleFailure
+    instead of stopping the rest. Rules from the workers are interned into
+    pool as they come back.
+    """
+    pool = pool or translate.PatternPool()
+    fn = translate.try_translate_rule if keep_going else translate.translate_rule
+    if workers <= 1 or len(rules) <= 1:
+        return [fn(rule, pool) for rule in rules]
+
+    chunksize = max(1, len(rules) // (workers * 4))
+    with ProcessPoolExecutor(workers) as executor:
+        return [
+            translate.intern_rule(result, pool) if isinstance(result, sssig.Rule) else result
+            for result in executor.map(fn, rules, chunksize=chunksize)
+        ]
+
+
+def convert(
+    paths: list[Path],
+    dst: Path,
+    default: Path | None = None,
+    workers: int | None = None,
+    shared: bool = False,
+    keep_going: bool = False,
+) -> BatchSummary:
+    """
+    Convert each config to dst/<name>.yaml.
+
+    Base configs pulled in with [extend] are loaded once, and every rule
+    that is identical across configs is translated only once. With
+    keep_going rules that fail to load or translate are left out and listed
+    in their config's summary, including those of the base configs it
+    extends. A config that fails to load as a whole, like one with a TOML
+    syntax error or a missing base, gets the error in its summary and the
+    other configs are still converted.
+    """
+    started = time.perf_counter()
+    workers = workers or os.process_cpu_count() or 1
+
+    outputs = [dst / f"{path.stem}.yaml" for path in paths]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("configs must have unique file names")
+
+    # Load every config, sharing resolved base configs
+    cache: dict[Path, gitleaks.Config] = {}
+    failure_cache: dict[Path, list[gitleaks.RuleFailure]] = {}
+    configs = []
+    load_seconds = []
+    load_failures: list[list[gitleaks.RuleFailure]] = []
+    errors: list[str | None] = []
+    for path in paths:
+        load_started = time.perf_counter()
+        failures = [] if keep_going else None
+        error = None
+        try:
+            config = gitleaks.load_path(path, default, cache, failures, failure_cache)
+        except (OSError, ValueError) as err:
+            if not keep_going:
+                raise
+            config, failures, error = gitleaks.Config(), [], gitleaks.describe_error(err)
+
+        configs.append(config)
+        load_seconds.append(time.perf_counter() - load_started)
+        load_failures.append(failures or [])
+        errors.append(error)
+
+    # Translate each distinct rule once
+    unique: dict[str, gitleaks.Rule] = {}
+    for config in configs:
+        for rule in config.rules:
+            unique.setdefault(rule.model_dump_json(), rule)
+
+    translate_started = time.perf_counter()
+    translated = dict(zip(unique, translate_rules(list(unique.values()), workers, keep_going)))
+    translate_seconds = time.perf_counter() - translate_started
+
+    # Assemble and write each config's rules
+    dst.mkdir(parents=True, exist_ok=True)
+    summaries = []
+    for path, output, config, loaded, failures, error in zip(
+        paths, outputs, configs, load_seconds, load_failures, errors
+    ):
+        if error is not None:
+            summaries.append(ConfigSummary(
+                src=path, dst=output, rules=0, load_seconds=loaded, write_seconds=0.0, error=error,
+            ))
+            continue
+
+        write_started = time.perf_counter()
+        results = [translated[rule.model_dump_json()] for rule in config.rules]
+        rules = sssig.Rules(
+            rules=[result for result in results if isinstance(result, sssig.Rule)]
+        )
+        with output.open("w") as fp:
+            sssig.dump(rules, fp, shared)
+
+        summaries.append(ConfigSummary(
+            src=path,
+            dst=output,
+            rules=len(rules.rules),
+            load_seconds=loaded,
+            write_seconds=time.perf_counter() - write_started,
+            failures=failures + [r for r in results if isinstance(r, gitleaks.RuleFailure)],
+        ))
+
+    return BatchSummary(
+        configs=summaries,
+        workers=workers,
+        total_rules=sum(len(config.rules) for config in configs),
+        unique_rules=len(unique),
+        translate_seconds=translate_seconds,
+        total_seconds=time.perf_counter() - started,
+    )
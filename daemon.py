@@ -0,0 +1,278 @@
+#!./.venv/bin/python3
+"""
+Serve conversion and scanning from a long running process.
+
+The translated rules, compiled hyperscan database and pattern validation
+cache stay warm between requests, and the source config is watched so the
+rules are rebuilt when it changes.
+"""
+import asyncio
+import bisect
+import io
+import json
+import re
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+import hyperscan
+from lark.exceptions import LarkError
+from pydantic import ValidationError
+
+import gitleaks
+import scan
+import sssig
+import translate
+
+# Routes requests are served on, which are the only latency labels so
+# clients can't add label values
+ROUTES = {
+    ("POST", "/scan"),
+    ("POST", "/convert"),
+    ("GET", "/rules"),
+    ("GET", "/stats"),
+    ("GET", "/metrics"),
+}
+
+
+class Histogram:
+    """
+    Request latency histogram with cumulative buckets in seconds.
+    """
+
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self) -> dict:
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.BUCKETS + (float("inf"),), self.counts):
+            total += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = total
+
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+    def to_prometheus(self, name: str, labels: str) -> list[str]:
+        data = self.to_dict()
+        lines = [
+            f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+            for bound, count in data["buckets"].items()
+        ]
+        lines.append(f"{name}_sum{{{labels}}} {data['sum']}")
+        lines.append(f"{name}_count{{{labels}}} {data['count']}")
+        return lines
+
+
+def mtime(path: Path) -> float | None:
+    """Modification time of a path, or None while it doesn't exist."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class Daemon:
+    """
+    Warm conversion and scanning state for one gitleaks config.
+    """
+
+    def __init__(self, src: Path, default: Path | None = None) -> None:
+        self.src = src
+        self.default = default
+        self.pool = translate.PatternPool()
+        self.translated: dict[str, sssig.Rule] = {}
+        self.mtimes: dict[Path, float | None] = {}
+        self.rules = sssig.Rules(rules=[])
+        self.scanner = scan.Scanner(self.rules)
+        self.latency: dict[str, Histogram] = {}
+        self.profile = scan.Profile()
+
+    def rebuild(self) -> None:
+        """
+        Reload the config, translating only the rules that changed.
+        """
+        started = time.perf_counter()
+        cache: dict[Path, gitleaks.Config] = {}
+        config = gitleaks.load_path(self.src, self.default, cache)
+        mtimes = {path: path.stat().st_mtime for path in cache}
+
+        translated = {}
+        for rule in config.rules:
+            key = rule.model_dump_json()
+            translated[key] = self.translated.get(key) or translate.translate_rule(rule, self.pool)
+
+        changed = len(translated.keys() - self.translated.keys())
+        rules = sssig.Rules(rules=list(translated.values()))
+        scanner = scan.Scanner(rules, som=False)
+
+        # Swap everything in at once so requests never see a partial build
+        self.translated, self.mtimes, self.rules, self.scanner = translated, mtimes, rules, scanner
+        print(
+            f"Built {len(rules.rules)} rules ({changed} translated) "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+
+    def changed(self) -> bool:
+        """Check if the config or any config it extends has changed."""
+        return any(mtime(path) != recorded for path, recorded in self.mtimes.items())
+
+    async def watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if not self.changed():
+                continue
+
+            try:
+                await asyncio.to_thread(self.rebuild)
+            except (OSError, ValueError, LarkError, re.error, hyperscan.error) as err:
+                # Keep serving the last good rules until the config is fixed
+                print(f"Rebuild failed: {err}")
+                # Missing files stay watched so they rebuild when they're back
+                self.mtimes = {path: mtime(path) for path in self.mtimes}
+
+    def convert(self, body: bytes) -> tuple[int, str, bytes]:
+        config = gitleaks.load(io.BytesIO(body))
+        if config.extend:
+            raise ValueError("[extend] is not supported for posted configs")
+
+        out = io.StringIO()
+        sssig.dump(translate.translate_config(config, self.pool), out)
+        return 200, "application/yaml", out.getvalue().encode()
+
+    def scan(self, body: bytes, path: str | None, profile: scan.Profile) -> tuple[int, str, bytes]:
+        findings = self.scanner.scan(body, path, profile)
+        data = json.dumps([finding.model_dump() for finding in findings])
+        return 200, "application/json", data.encode()
+
+    def stats(self) -> tuple[int, str, bytes]:
+        data = {route: histogram.to_dict() for route, histogram in self.latency.items()}
+        return 200, "application/json", json.dumps(data).encode()
+
+    def metrics(self) -> tuple[int, str, bytes]:
+        lines = [
+            "# HELP gl2s3ig_request_seconds Request latency",
+            "# TYPE gl2s3ig_request_seconds histogram",
+        ]
+        for route, histogram in sorted(self.latency.items()):
+            lines.extend(histogram.to_prometheus("gl2s3ig_request_seconds", f'route="{route}"'))
+
+        data = "\n".join(lines) + "\n" + self.profile.to_prometheus()
+        return 200, "text/plain; version=0.0.4", data.encode()
+
+    def dump_rules(self) -> tuple[int, str, bytes]:
+        out = io.StringIO()
+        sssig.dump(self.rules, out)
+        return 200, "application/yaml", out.getvalue().encode()
+
+    async def route(self, method: str, target: str, body: bytes) -> tuple[int, str, bytes]:
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+
+        if (method, url.path) == ("POST", "/scan"):
+            # Each request profiles into its own counters, merged back here
+            # on the event loop so scanning threads never share them
+            profile = scan.Profile()
+            response = await asyncio.to_thread(self.scan, body, query.get("path", [None])[0], profile)
+            self.profile.merge(profile)
+            return response
+        if (method, url.path) == ("POST", "/convert"):
+            return await asyncio.to_thread(self.convert, body)
+        if (method, url.path) == ("GET", "/rules"):
+            return self.dump_rules()
+        if (method, url.path) == ("GET", "/stats"):
+            return self.stats()
+        if (method, url.path) == ("GET", "/metrics"):
+            return self.metrics()
+
+        return 404, "text/plain", b"not found\n"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve a single HTTP/1.1 request per connection.
+        """
+        started = time.perf_counter()
+        route = "invalid"
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ", 2)
+            path = urlsplit(target).path
+            if (method, path) in ROUTES:
+                route = f"{method} {path}"
+
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, content_type, data = await self.route(method, target, body)
+        except (ValueError, ValidationError, LarkError, asyncio.IncompleteReadError) as err:
+            status, content_type, data = 400, "text/plain", f"{err}\n".encode()
+
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+        writer.close()
+
+        self.latency.setdefault(route, Histogram()).observe(time.perf_counter() - started)
+
+
+def new_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="gl2s3ig-daemon",
+        description="Serve Gitleaks to SSSIG conversion and scanning",
+    )
+    parser.add_argument(
+        "src", type=Path, help="source gitleaks config.toml to watch"
+    )
+    parser.add_argument(
+        "--default-config",
+        type=Path,
+        help="gitleaks config used by [extend] useDefault",
+    )
+    parser.add_argument(
+        "--socket", type=Path, help="listen on a unix socket instead of tcp"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="localhost tcp port (default: 8765)"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="seconds between config checks"
+    )
+    return parser
+
+
+async def serve(daemon: Daemon, args) -> None:
+    await asyncio.to_thread(daemon.rebuild)
+
+    if args.socket:
+        server = await asyncio.start_unix_server(daemon.handle, path=args.socket)
+    else:
+        server = await asyncio.start_server(daemon.handle, host="127.0.0.1", port=args.port)
+
+    print(f"Listening on {args.socket or f'127.0.0.1:{args.port}'}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), daemon.watch(args.interval))
+
+
+def main() -> None:
+    args = new_parser().parse_args()
+    asyncio.run(serve(Daemon(args.src, args.default_config), args))
+
+
+if __name__ == "__main__":
+    main()
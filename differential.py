@@ -0,0 +1,274 @@
+#!./.venv/bin/python3
+"""
+Compare gitleaks semantics with the translated SSSIG rules on a corpus.
+
+The reference side evaluates the original gitleaks rules with python's re,
+following gitleaks' keyword, secretGroup, entropy and allowlist handling,
+including the config's global allowlists.
+The translated side runs the SSSIG rules through the hyperscan scanner.
+Findings are compared per rule, and the throughput of each side is timed.
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+
+from pydantic import BaseModel
+
+import gitleaks
+import scan
+import translate
+
+
+def _secret(match, secret_group: int | None) -> tuple[int, int]:
+    """
+    Span of the secret in a match the way gitleaks picks it.
+
+    Without a secretGroup the first non-empty capture group is the secret,
+    falling back to the whole match.
+    """
+    if secret_group:
+        return match.span(secret_group)
+
+    for group in range(1, (match.re.groups or 0) + 1):
+        start, end = match.span(group)
+        if end > start:
+            return start, end
+
+    return match.span()
+
+
+def allowed(
+    allowlist: gitleaks.Allowlist,
+    path: bytes,
+    secret: bytes,
+    match: bytes,
+    line: bytes,
+) -> bool:
+    """
+    Check a finding against a gitleaks allowlist.
+    """
+    checks = []
+    if allowlist.paths:
+        checks.append(any(scan.compile_pattern(p).search(path) for p in allowlist.paths))
+    if allowlist.regexes:
+        value = {
+            gitleaks.RegexTarget.MATCH: match,
+            gitleaks.RegexTarget.LINE: line,
+        }.get(allowlist.regexTarget, secret)
+        checks.append(any(scan.compile_pattern(p).search(value) for p in allowlist.regexes))
+    if allowlist.stopwords:
+        lowered = secret.lower()
+        checks.append(any(word.lower().encode() in lowered for word in allowlist.stopwords))
+
+    if allowlist.condition == gitleaks.AllowlistCondition.AND:
+        return bool(checks) and all(checks)
+
+    return any(checks)
+
+
+class Reference:
+    """
+    Evaluate gitleaks rules with python's re.
+    """
+
+    def __init__(self, config: gitleaks.Config) -> None:
+        self.rules = [
+            (rule, translate.generate_sssig_id(rule.id))
+            for rule in config.rules
+        ]
+        self.allowlists = config.allowlists or []
+
+    def scan(self, data: bytes, path: str) -> list[scan.Finding]:
+        findings = []
+        encoded_path = path.encode()
+        lowered = data.lower()
+
+        for rule, rule_id in self.rules:
+            if rule.keywords and not any(k.lower().encode() in lowered for k in rule.keywords):
+                continue
+            if rule.path and not scan.compile_pattern(rule.path).search(encoded_path):
+                continue
+
+            allowlists = [
+                allowlist
+                for allowlist in self.allowlists
+                if not allowlist.targetRules or rule.id in allowlist.targetRules
+            ] + (rule.allowlists or [])
+
+            if not rule.regex:
+                if any(allowed(allowlist, encoded_path, b"", b"", b"") for allowlist in allowlists):
+                    continue
+
+                # Path only rules report the file itself
+                findings.append(scan.Finding(
+                    rule_id=rule_id, path=path, line=1, start=0, end=0, target="", match="",
+                ))
+                continue
+
+            for match in scan.compile_pattern(rule.regex).finditer(data):
+                start, end = _secret(match, rule.secretGroup)
+                secret = data[start:end]
+                if rule.entropy is not None and scan.entropy(secret) <= rule.entropy:
+                    continue
+
+                line_start = data.rfind(b"\n", 0, match.start()) + 1
+                line_end = data.find(b"\n", match.end())
+                line = data[line_start:line_end if line_end >= 0 else len(data)]
+                if any(
+                    allowed(allowlist, encoded_path, secret, match[0], line)
+                    for allowlist in allowlists
+                ):
+                    continue
+
+                findings.append(scan.Finding(
+                    rule_id=rule_id,
+                    path=path,
+                    line=data.count(b"\n", 0, start) + 1,
+                    start=start,
+                    end=end,
+                    target=secret.decode(errors="replace"),
+                    match=match[0].decode(errors="replace"),
+                ))
+
+        return findings
+
+
+class RuleDiff(BaseModel):
+    rule_id: str
+    gitleaks_id: str
+    # Found with gitleaks semantics but not by the translated rule
+    missing: list[scan.Finding]
+    # Found by the translated rule but not with gitleaks semantics
+    extra: list[scan.Finding]
+
+
+class Report(BaseModel):
+    files: int
+    bytes: int
+    reference_findings: int
+    reference_seconds: float
+    translated_findings: int
+    translated_seconds: float
+    compile_seconds: float
+    diffs: list[RuleDiff]
+
+
+def _key(finding: scan.Finding) -> tuple:
+    return finding.path, finding.line, finding.target
+
+
+def _difference(left: list[scan.Finding], right: list[scan.Finding]) -> list[scan.Finding]:
+    """Findings in left without a matching finding in right."""
+    remaining = Counter(_key(finding) for finding in right)
+    difference = []
+    for finding in left:
+        if remaining[_key(finding)]:
+            remaining[_key(finding)] -= 1
+        else:
+            difference.append(finding)
+
+    return difference
+
+
+def run(config: gitleaks.Config, corpus: Path) -> Report:
+    """
+    Run the corpus through both sides and compare the findings per rule.
+    """
+    compile_started = time.perf_counter()
+    reference = Reference(config)
+    scanner = scan.Scanner(translate.translate_config(config), som=False)
+    compile_seconds = time.perf_counter() - compile_started
+
+    files = [(path, path.read_bytes()) for path in scan.walk([corpus])]
+
+    reference_findings = []
+    started = time.perf_counter()
+    for path, data in files:
+        reference_findings.extend(reference.scan(data, str(path)))
+    reference_seconds = time.perf_counter() - started
+
+    translated_findings = []
+    started = time.perf_counter()
+    for path, data in files:
+        translated_findings.extend(scanner.scan(data, str(path)))
+    translated_seconds = time.perf_counter() - started
+
+    expected: dict[str, list[scan.Finding]] = {}
+    for finding in reference_findings:
+        expected.setdefault(finding.rule_id, []).append(finding)
+
+    actual: dict[str, list[scan.Finding]] = {}
+    for finding in translated_findings:
+        actual.setdefault(finding.rule_id, []).append(finding)
+
+    diffs = []
+    for rule, rule_id in reference.rules:
+        missing = _difference(expected.get(rule_id, []), actual.get(rule_id, []))
+        extra = _difference(actual.get(rule_id, []), expected.get(rule_id, []))
+        if missing or extra:
+            diffs.append(RuleDiff(rule_id=rule_id, gitleaks_id=rule.id, missing=missing, extra=extra))
+
+    return Report(
+        files=len(files),
+        bytes=sum(len(data) for _, data in files),
+        reference_findings=len(reference_findings),
+        reference_seconds=reference_seconds,
+        translated_findings=len(translated_findings),
+        translated_seconds=translated_seconds,
+        compile_seconds=compile_seconds,
+        diffs=diffs,
+    )
+
+
+def new_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="gl2s3ig-differential",
+        description="Compare gitleaks semantics with translated SSSIG rules",
+    )
+    parser.add_argument(
+        "src", type=Path, help="source gitleaks config.toml"
+    )
+    parser.add_argument(
+        "corpus", type=Path, help="file or directory to scan"
+    )
+    parser.add_argument(
+        "--default-config",
+        type=Path,
+        help="gitleaks config used by [extend] useDefault",
+    )
+    return parser
+
+
+def _throughput(size: int, seconds: float) -> str:
+    return f"{size / seconds / 1e6:.2f} MB/s" if seconds else "n/a"
+
+
+def main() -> None:
+    args = new_parser().parse_args()
+    report = run(gitleaks.load_path(args.src, args.default_config), args.corpus)
+
+    for diff in report.diffs:
+        print(f"{diff.rule_id} ({diff.gitleaks_id}): {len(diff.missing)} missing, {len(diff.extra)} extra")
+        for finding in diff.missing:
+            print(f"  - {finding.path}:{finding.line}: {finding.target!r}")
+        for finding in diff.extra:
+            print(f"  + {finding.path}:{finding.line}: {finding.target!r}")
+
+    print(f"Scanned {report.files} files ({report.bytes} bytes)")
+    print(
+        f"gitleaks: {report.reference_findings} findings in {report.reference_seconds:.3f}s "
+        f"({_throughput(report.bytes, report.reference_seconds)})"
+    )
+    print(
+        f"sssig: {report.translated_findings} findings in {report.translated_seconds:.3f}s "
+        f"({_throughput(report.bytes, report.translated_seconds)}, "
+        f"compiled in {report.compile_seconds:.3f}s)"
+    )
+    print(f"{len(report.diffs)} rules with mismatched findings")
+    sys.exit(1 if report.diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,11 @@ import enum
 import tomllib
 
 from enum import StrEnum
+from pathlib import Path
 from typing import BinaryIO
 
 from pydantic import BaseModel
+from pydantic import ValidationError
 from pydantic import model_validator
 
 from sssig import OptionalPositiveInt
@@ -29,6 +31,8 @@ class Allowlist(BaseModel):
     paths: list[Pattern] | None = None
     regexes: list[Pattern] | None = None
     stopwords: list[str] | None = None
+    # Rule ids a global allowlist is limited to (all rules when unset)
+    targetRules: list[str] | None = None
 
 
 class Required(BaseModel):
@@ -42,6 +46,7 @@ class Rule(BaseModel):
     description: str | None = None
     path: Pattern | None = None
     regex: Pattern | None = None
+    secretGroup: OptionalPositiveInt = None
     entropy: OptionalPositiveFloat = None
     keywords: list[str] | None = None
     tags: list[str] | None = None
@@ -59,11 +64,163 @@ class Rule(BaseModel):
         return data
 
 
+class Extend(BaseModel):
+    path: str | None = None
+    url: str | None = None
+    useDefault: bool | None = None
+    disabledRules: list[str] | None = None
+
+
 class Config(BaseModel):
-    rules: list[Rule]
+    extend: Extend | None = None
+    allowlists: list[Allowlist] | None = None
+    rules: list[Rule] = []
+
+    @model_validator(mode='before')
+    @classmethod
+    def convert_allowlist_to_allowlists(cls, data):
+        """Add the global [allowlist] to the [[allowlists]] list."""
+        if isinstance(data, dict) and 'allowlist' in data:
+            data = dict(data)
+            data['allowlists'] = [data.pop('allowlist')] + (data.get('allowlists') or [])
+        return data
 
 
-def load(fp: BinaryIO) -> Config:
-    """Load a Gitleaks config from a TOML file."""
+class RuleFailure(BaseModel):
+    # Id of the gitleaks rule that failed to load or translate
+    rule_id: str
+    reason: str
+
+
+def describe_error(err: Exception) -> str:
+    """Describe why a rule failed on one line."""
+    if isinstance(err, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}" if error["loc"] else error["msg"]
+            for error in err.errors()
+        )
+
+    return str(err)
+
+
+def load(fp: BinaryIO, failures: list[RuleFailure] | None = None) -> Config:
+    """
+    Load a Gitleaks config from a TOML file.
+
+    When a failures list is given, rules that don't validate are left out
+    and recorded in it instead of failing the whole config.
+    """
     data = tomllib.load(fp)
+    if failures is not None:
+        rules = []
+        for index, raw in enumerate(data.get("rules", [])):
+            try:
+                rules.append(Rule.model_validate(raw))
+            except ValidationError as err:
+                rule_id = raw.get("id") if isinstance(raw, dict) else None
+                failures.append(RuleFailure(
+                    rule_id=str(rule_id or f"rules[{index}]"),
+                    reason=describe_error(err),
+                ))
+        data = {**data, "rules": rules}
+
     return Config.model_validate(data)
+
+
+def merge_rule(rule: Rule, base: Rule) -> Rule:
+    """
+    Merge a rule over the base rule with the same id.
+
+    Mirrors gitleaks: scalar fields set on the rule win, list fields are
+    appended to the base ones.
+    """
+    merged = base.model_copy(update={k: v for k, v in rule if v is not None})
+    for field in ("keywords", "tags", "allowlists"):
+        values = (getattr(base, field) or []) + (getattr(rule, field) or [])
+        setattr(merged, field, values or None)
+
+    return merged
+
+
+def extend(config: Config, base: Config) -> Config:
+    """Layer a config over the base config it extends."""
+    disabled = set(config.extend.disabledRules or []) if config.extend else set()
+    rules = {rule.id: rule for rule in base.rules if rule.id not in disabled}
+    for rule in config.rules:
+        rules[rule.id] = merge_rule(rule, rules[rule.id]) if rule.id in rules else rule
+
+    allowlists = (base.allowlists or []) + (config.allowlists or [])
+    return Config(allowlists=allowlists or None, rules=list(rules.values()))
+
+
+def load_path(
+    path: Path,
+    default: Path | None = None,
+    cache: dict[Path, Config] | None = None,
+    failures: list[RuleFailure] | None = None,
+    failure_cache: dict[Path, list[RuleFailure]] | None = None,
+) -> Config:
+    """
+    Load a Gitleaks config and resolve its [extend] base configs.
+
+    Relative extend paths are resolved from the extending config's
+    directory, and useDefault extends the config at ``default``. Resolved
+    configs are stored in ``cache`` so shared bases are only loaded once.
+    Invalid rules are recorded in ``failures`` if it's given, see load.
+    Share ``failure_cache`` along with ``cache`` to have the failures of a
+    cached base recorded for every config that extends it.
+    """
+    return _load_path(
+        path.resolve(),
+        default,
+        {} if cache is None else cache,
+        {} if failure_cache is None else failure_cache,
+        (),
+        failures,
+    )
+
+
+def _load_path(
+    path: Path,
+    default: Path | None,
+    cache: dict[Path, Config],
+    failure_cache: dict[Path, list[RuleFailure]],
+    chain: tuple[Path, ...],
+    failures: list[RuleFailure] | None,
+) -> Config:
+    if path in cache:
+        if failures is not None:
+            failures.extend(failure_cache.get(path, []))
+        return cache[path]
+
+    if path in chain:
+        raise ValueError(f"{path}: circular extend")
+
+    # Failures of this config and its bases, replayed when it's cached
+    loaded = None if failures is None else []
+    with path.open("rb") as fp:
+        config = load(fp, loaded)
+
+    if config.extend:
+        if config.extend.url:
+            raise ValueError(f"{path}: extending from a url is not supported")
+
+        if config.extend.useDefault:
+            if default is None:
+                raise ValueError(f"{path}: useDefault requires a default config")
+            base_path = default
+        elif config.extend.path:
+            base_path = path.parent / config.extend.path
+        else:
+            raise ValueError(f"{path}: extend requires a path or useDefault")
+
+        base = _load_path(
+            base_path.resolve(), default, cache, failure_cache, chain + (path,), loaded
+        )
+        config = extend(config, base)
+
+    if loaded is not None:
+        failures.extend(loaded)
+        failure_cache[path] = loaded
+    cache[path] = config
+    return config
@@ -1,9 +1,13 @@
 #!./.venv/bin/python3
-import yaml
+import os
+import sys
 from argparse import ArgumentParser
+from argparse import Namespace
 from pathlib import Path
 
+import batch
 import gitleaks
+import sssig
 import translate
 
 
@@ -18,34 +22,146 @@ def new_parser() -> ArgumentParser:
     parser.add_argument(
         "dst", type=Path, help="destination SSSIG rules.yaml"
     )
+    parser.add_argument(
+        "--share-filters",
+        action="store_true",
+        help="emit identical filters once as YAML anchors referenced by id",
+    )
+    parser.add_argument(
+        "--default-config",
+        type=Path,
+        help="gitleaks config used by [extend] useDefault",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="scope inline flags like (?i) so split target patterns keep them",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="treat src as a directory or manifest of configs and dst as an output directory",
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="translate every rule in parallel, writing the ones that translate "
+        "and reporting the rest (exits 1 if any failed)",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="write a JSON report of the conversion, including failed rules",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="worker processes for --batch and --keep-going (default: cpu count)",
+    )
     return parser
 
 
-def main() -> None:
-    args = new_parser().parse_args()
+def print_failures(failures: list[gitleaks.RuleFailure]) -> None:
+    for failure in failures:
+        print(f"Skipped {failure.rule_id}: {failure.reason}")
+
 
+def convert(args: Namespace) -> list[gitleaks.RuleFailure]:
     # Load the gitleaks config
-    with args.src.open("rb") as fp:
-        config = gitleaks.load(fp)
+    failures = [] if args.keep_going else None
+    config = gitleaks.load_path(args.src, args.default_config, failures=failures)
 
     print(f"Loaded {len(config.rules)} rules from {args.src}")
 
     # Translate to SSSIG format
-    sssig_rules = translate.translate_config(config)
+    pool = translate.PatternPool()
+    if failures is not None:
+        results = batch.translate_rules(
+            config.rules, args.workers or os.process_cpu_count() or 1, keep_going=True, pool=pool
+        )
+        sssig_rules = sssig.Rules(rules=[r for r in results if isinstance(r, sssig.Rule)])
+        failures += [r for r in results if isinstance(r, gitleaks.RuleFailure)]
+        print_failures(failures)
+    else:
+        sssig_rules = translate.translate_config(config, pool)
+        failures = []
+
+    print(f"Translated {len(sssig_rules.rules)} rules to SSSIG format ({len(failures)} failed)")
+    if pool.string_count:
+        print(
+            f"Interned {pool.string_count} patterns/strings "
+            f"({pool.unique_string_count} unique, "
+            f"{translate.dedupe_ratio(pool.string_count, pool.unique_string_count):.2f}x dedupe)"
+        )
 
-    print(f"Translated {len(sssig_rules.rules)} rules to SSSIG format")
+    if args.optimize:
+        sssig_rules, summary = translate.optimize_rules(sssig_rules, pool)
+        print(f"Scoped the flags of {summary.optimized} rules ({len(summary.reverted)} reverted)")
+        for rule_id in summary.reverted:
+            print(f"  {rule_id}: the rewrite changed the pattern, kept the original patterns")
 
     # Write to destination
     with args.dst.open("w") as fp:
-        yaml.dump(
-            sssig_rules.model_dump(mode="json", exclude_none=True),
-            fp,
-            default_flow_style=False,
-            sort_keys=False,
-        )
+        sssig.dump(sssig_rules, fp, args.share_filters)
 
     print(f"Wrote SSSIG rules to {args.dst}")
 
+    if args.report:
+        report = translate.TranslateReport(translated=len(sssig_rules.rules), failures=failures)
+        args.report.write_text(report.model_dump_json(indent=2))
+
+    return failures
+
+
+def convert_batch(args: Namespace) -> int:
+    """Convert every config, returning the number of failed rules and configs."""
+    paths = batch.find_configs(args.src)
+    print(f"Converting {len(paths)} configs from {args.src}")
+
+    summary = batch.convert(
+        paths,
+        args.dst,
+        default=args.default_config,
+        workers=args.workers,
+        shared=args.share_filters,
+        keep_going=args.keep_going,
+    )
+
+    for config in summary.configs:
+        if config.error is not None:
+            print(f"Skipped {config.src}: {config.error}")
+            continue
+
+        print_failures(config.failures)
+        print(
+            f"Wrote {config.rules} rules from {config.src} to {config.dst} "
+            f"(load {config.load_seconds:.3f}s, write {config.write_seconds:.3f}s)"
+        )
+
+    print(
+        f"Translated {summary.unique_rules} unique of {summary.total_rules} rules "
+        f"with {summary.workers} workers in {summary.translate_seconds:.3f}s"
+    )
+    print(f"Converted {len(summary.configs)} configs in {summary.total_seconds:.3f}s")
+
+    if args.report:
+        args.report.write_text(summary.model_dump_json(indent=2))
+
+    return sum(len(config.failures) + (config.error is not None) for config in summary.configs)
+
+
+def main() -> None:
+    args = new_parser().parse_args()
+
+    if args.batch:
+        if args.optimize:
+            new_parser().error("--optimize is not supported with --batch")
+        failed = convert_batch(args)
+    else:
+        failed = len(convert(args))
+
+    sys.exit(1 if failed else 0)
+
 
 if __name__ == "__main__":
     main()
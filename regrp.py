@@ -1,8 +1,8 @@
 #!.venv/bin/python3
+import re
 import sys
 
 from lark import Lark
-from lark import Token
 from lark import Tree
 
 _parser = Lark(r"""
@@ -70,6 +70,147 @@ def split_regexp(group: int, regexp: str) -> (str, str, str):
     return regexp[:start_pos], regexp[start_pos+1:end_pos-1], regexp[end_pos:]
 
 
+# A quantifier at the start of a segment
+_QUANTIFIER = re.compile(r"(?:[*+?]|\{\d*,?\d*\})[+?]?")
+
+
+def count_groups(regexp: str) -> int:
+    """
+    Count the capture groups in a regexp.
+    """
+    return sum(
+        1 for group in _parser.parse(regexp).find_data("group")
+        if _is_capture_group(group)
+    )
+
+
+def _flags(node) -> str | None:
+    """The modifiers of a flag only group like (?i), or None."""
+    if not isinstance(node, Tree):
+        return None
+
+    _, mod, body, _ = node.children
+    if mod is not None and body is None and ":" not in mod:
+        return str(mod)[1:]
+
+    return None
+
+
+def _alternatives(nodes: list) -> list[list]:
+    """
+    Split a sequence of nodes on its | outside of character classes.
+
+    Plain segments come back as strings, escapes as their own strings and
+    groups as trees.
+    """
+    alternatives: list[list] = [[]]
+    in_class = first = False
+    for node in nodes:
+        if isinstance(node, Tree) or getattr(node, "type", None) == "ESCAPE_SEQUENCE":
+            alternatives[-1].append(node if isinstance(node, Tree) else str(node))
+            first = False
+            continue
+
+        start = 0
+        for i, char in enumerate(node):
+            if not in_class:
+                if char == "[":
+                    in_class = first = True
+                elif char == "|":
+                    alternatives[-1].append(str(node[start:i]))
+                    alternatives.append([])
+                    start = i + 1
+            elif first and char == "^" and node[i - 1:i] == "[":
+                continue
+            else:
+                # a ] right after [ or [^ is a literal
+                in_class = char != "]" or first
+                first = False
+
+        alternatives[-1].append(str(node[start:]))
+
+    return [[item for item in alternative if item != ""] for alternative in alternatives]
+
+
+def _scoped(on: set[str], off: set[str], text: str) -> str:
+    if not text or not (on or off):
+        return text
+
+    return f"(?{''.join(sorted(on))}{'-' if off else ''}{''.join(sorted(off))}:{text})"
+
+
+def _group(node: Tree, python: bool) -> str:
+    _, mod, body, _ = node.children
+    return f"({mod or ''}{_render(body.children, python) if body else ''})"
+
+
+def _render(nodes: list, python: bool, top: bool = False) -> str:
+    """
+    Render a sequence of nodes with its inline flags scoped.
+
+    An inline flag like (?i) applies to the rest of its group, including the
+    alternatives after it. Each run between capture groups is wrapped in its
+    own (?flags:...) and capture groups carry the flags inside them, so they
+    stay at the level they were and can still be split apart.
+    """
+    on: set[str] = set()
+    off: set[str] = set()
+    alternatives = []
+    for items in _alternatives(nodes):
+        out: list[str] = []
+        run: list[str] = []
+        for item in items:
+            if not isinstance(item, Tree):
+                # python's \Z is the end of text anchor that is \z elsewhere
+                run.append("\\Z" if python and item == "\\z" else item)
+                continue
+
+            if (mod := _flags(item)) is not None:
+                out.append(_scoped(on, off, "".join(run)))
+                run = []
+                add, _, remove = mod.partition("-")
+                on = (on | set(add)) - set(remove)
+                # off is relative to the enclosing flags, which are none at the top
+                off = set() if top else (off | set(remove)) - set(add)
+                continue
+
+            if _is_capture_group(item):
+                out.append(_scoped(on, off, "".join(run)))
+                run = []
+                body = item.children[2]
+                out.append(f"({_scoped(on, off, _render(body.children, python) if body else '')})")
+                continue
+
+            run.append(_group(item, python))
+
+        text = "".join(run)
+        if out and (quantifier := _QUANTIFIER.match(text)):
+            # a quantifier after a capture group belongs to that group
+            out.append(quantifier[0])
+            text = text[quantifier.end():]
+        out.append(_scoped(on, off, text))
+        alternatives.append("".join(out))
+
+    return "|".join(alternatives)
+
+
+def to_python(regexp: str) -> str:
+    """
+    Rewrite a hyperscan/gitleaks regexp into one python's re accepts.
+    """
+    return _render(_parser.parse(regexp).children, python=True, top=True)
+
+
+def scope_flags(regexp: str) -> str:
+    """
+    Rewrite a regexp with its inline flags scoped to the parts they apply to.
+
+    Capture groups keep their numbers and carry the flags inside them, so
+    the pattern can be split around a group without losing its flags.
+    """
+    return _render(_parser.parse(regexp).children, python=False, top=True)
+
+
 if __name__ == "__main__":
     p, t, s = split_regexp(int(sys.argv[1]), sys.argv[2])
     print("prefix:", p)
@@ -0,0 +1,1006 @@
+#!./.venv/bin/python3
+"""
+Scan content for secrets with SSSIG rules.
+"""
+import bisect
+import math
+import mmap
+import os
+import re
+import threading
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from pathlib import Path
+
+import hyperscan
+from lark.exceptions import LarkError
+from pydantic import BaseModel
+
+import regrp
+import sssig
+import translate
+
+
+class Finding(BaseModel):
+    rule_id: str
+    path: str | None = None
+    # 1-based line of the start of the target
+    line: int
+    # Byte offsets of the target in the scanned content
+    start: int
+    end: int
+    target: str
+    match: str
+
+
+@cache
+def compile_pattern(pattern: str) -> re.Pattern[bytes]:
+    """
+    Compile a hyperscan pattern with python's re once per unique pattern.
+    """
+    try:
+        pattern = regrp.to_python(pattern)
+    except LarkError:
+        pass
+
+    return re.compile(pattern.encode())
+
+
+def full_pattern(target: sssig.Target) -> str:
+    """
+    Rebuild the full pattern of a target with the target as a group.
+    """
+    return f"{target.prefix_pattern or ''}({target.pattern}){target.suffix_pattern or ''}"
+
+
+def target_group(target: sssig.Target) -> int:
+    """
+    Index of the target group in the full pattern.
+    """
+    if not target.prefix_pattern:
+        return 1
+
+    return compile_pattern(target.prefix_pattern).groups + 1
+
+
+def entropy(data: bytes) -> float:
+    """
+    Shannon entropy of the data in bits per byte.
+    """
+    if not data:
+        return 0.0
+
+    return -sum(
+        count / len(data) * math.log2(count / len(data))
+        for count in Counter(data).values()
+    )
+
+
+def _search_any(patterns: list[str] | None, value: bytes) -> bool:
+    return any(compile_pattern(pattern).search(value) for pattern in patterns or ())
+
+
+def _contains_any(strings: list[str] | None, value: bytes) -> bool:
+    if not strings:
+        return False
+
+    value = bytes(value).lower()
+    return any(string.lower().encode() in value for string in strings or ())
+
+
+def _checks(
+    f: sssig.ExcludeFilter | sssig.RequireFilter,
+    path: bytes | None,
+    target: bytes,
+    match: bytes,
+    context: bytes,
+) -> list[bool]:
+    """Evaluate each feature the filter sets."""
+    checks = []
+    if f.target_strings is not None:
+        checks.append(_contains_any(f.target_strings, target))
+    if f.path_patterns is not None and path is not None:
+        checks.append(_search_any(f.path_patterns, path))
+    if f.path_strings is not None and path is not None:
+        checks.append(_contains_any(f.path_strings, path))
+    if f.context_strings is not None:
+        checks.append(_contains_any(f.context_strings, context))
+
+    if isinstance(f, sssig.ExcludeFilter):
+        if f.target_patterns is not None:
+            checks.append(_search_any(f.target_patterns, target))
+        if f.match_patterns is not None:
+            checks.append(_search_any(f.match_patterns, match))
+        if f.match_strings is not None:
+            checks.append(_contains_any(f.match_strings, match))
+        if f.context_patterns is not None:
+            checks.append(_search_any(f.context_patterns, context))
+    elif f.target_min_entropy is not None:
+        checks.append(entropy(target) >= f.target_min_entropy)
+
+    return checks
+
+
+def path_required(rule: sssig.Rule) -> bool:
+    """Check if a rule only applies to some paths."""
+    return any(
+        isinstance(f, sssig.RequireFilter)
+        and (f.path_patterns is not None or f.path_strings is not None)
+        for f in rule.filters or ()
+    )
+
+
+def path_allowed(rule: sssig.Rule, path: bytes) -> bool:
+    """Check a path against the path requirements of a rule."""
+    for f in rule.filters or ():
+        if not isinstance(f, sssig.RequireFilter):
+            continue
+        if f.path_patterns is not None and not _search_any(f.path_patterns, path):
+            return False
+        if f.path_strings is not None and not _contains_any(f.path_strings, path):
+            return False
+
+    return True
+
+
+def keep(
+    filters: list[sssig.ExcludeFilter | sssig.RequireFilter] | None,
+    path: bytes | None,
+    target: bytes,
+    match: bytes,
+    context: bytes,
+) -> bool:
+    """
+    Apply rule filters to a candidate finding.
+
+    Require filters need every feature they set to match, exclude filters
+    drop the candidate when any of their features match (the default
+    condition of a gitleaks allowlist).
+    """
+    for f in filters or ():
+        checks = _checks(f, path, target, match, context)
+        if isinstance(f, sssig.ExcludeFilter):
+            if any(checks):
+                return False
+        elif not all(checks):
+            return False
+
+    return True
+
+
+class RuleCost:
+    """
+    Scan cost counters of one rule.
+    """
+
+    def __init__(self) -> None:
+        # Hyperscan match callbacks
+        self.callbacks = 0
+        # Matches of the confirmation regex
+        self.candidates = 0
+        # Candidates dropped by the rule filters
+        self.rejected = 0
+        self.confirm_seconds = 0.0
+        self.filter_seconds = 0.0
+
+    @property
+    def findings(self) -> int:
+        return self.candidates - self.rejected
+
+    @property
+    def seconds(self) -> float:
+        return self.confirm_seconds + self.filter_seconds
+
+    def merge(self, other: "RuleCost") -> None:
+        self.callbacks += other.callbacks
+        self.candidates += other.candidates
+        self.rejected += other.rejected
+        self.confirm_seconds += other.confirm_seconds
+        self.filter_seconds += other.filter_seconds
+
+
+class Profile:
+    """
+    Per-rule scan cost counters.
+
+    Give each worker its own profile and merge them when the scan is done
+    so the scan loop never shares counters.
+    """
+
+    METRICS = (
+        ("callbacks", "counter", "Hyperscan match callbacks"),
+        ("candidates", "counter", "Candidate findings from the confirmation regex"),
+        ("rejected", "counter", "Candidate findings rejected by the rule filters"),
+        ("findings", "counter", "Findings reported"),
+        ("confirm_seconds", "counter", "Seconds spent confirming matches"),
+        ("filter_seconds", "counter", "Seconds spent applying filters"),
+    )
+
+    def __init__(self) -> None:
+        self.costs: dict[str, RuleCost] = {}
+
+    def cost(self, rule_id: str) -> RuleCost:
+        cost = self.costs.get(rule_id)
+        if cost is None:
+            cost = self.costs[rule_id] = RuleCost()
+
+        return cost
+
+    def merge(self, other: "Profile") -> None:
+        for rule_id, cost in other.costs.items():
+            self.cost(rule_id).merge(cost)
+
+    def ranked(self) -> list[tuple[str, RuleCost]]:
+        """Rules from the most to the least expensive."""
+        return sorted(
+            self.costs.items(),
+            key=lambda item: (item[1].seconds, item[1].callbacks),
+            reverse=True,
+        )
+
+    def to_prometheus(self, prefix: str = "gl2s3ig_rule") -> str:
+        """Render the counters in the Prometheus text format."""
+        lines = []
+        for field, kind, description in self.METRICS:
+            name = f"{prefix}_{field}_total"
+
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for rule_id, cost in sorted(self.costs.items()):
+                lines.append(f'{name}{{rule_id="{rule_id}"}} {getattr(cost, field)}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Rules without start of match tracking only need to report once per scan
+SCAN_FLAGS = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY
+
+
+@cache
+def supports_som(pattern: str, flags: int) -> bool:
+    """
+    Check if hyperscan can track the start of match for a pattern.
+
+    Large bounded repeats are rejected with "Pattern is too large".
+    """
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=[pattern.encode()],
+            flags=[(flags & ~hyperscan.HS_FLAG_SINGLEMATCH) | hyperscan.HS_FLAG_SOM_LEFTMOST],
+        )
+    except hyperscan.error:
+        return False
+
+    return True
+
+
+# Files are packed with a newline between them so line anchors match at
+# the edges of each file
+PACK_SEPARATOR = b"\n"
+
+_BUFFER_ANCHORS = re.compile(rb"(?<!\\)((?:\\\\)*)\\([AZz])")
+
+# Files at least this big are memory mapped instead of read
+MMAP_SIZE = 16 << 20
+
+
+def _line_anchors(expression: bytes) -> bytes:
+    """
+    Replace the buffer anchors of an expression with line anchors.
+
+    In multiline mode these match at the edges of every line, including
+    the edges of each file packed into a buffer.
+    """
+    return _BUFFER_ANCHORS.sub(lambda m: m[1] + (b"^" if m[2] == b"A" else b"$"), expression)
+
+
+def _count(data, sub: bytes, start: int, end: int) -> int:
+    """Count sub in data[start:end], including buffers without count like mmap."""
+    if isinstance(data, bytes):
+        return data.count(sub, start, end)
+
+    return data[start:end].count(sub)
+
+
+def _anchored(regex: re.Pattern[bytes], data, spans: list[tuple[int, int]]):
+    """
+    Confirm matches at the (start, end) spans hyperscan reported.
+
+    Hyperscan only reports the leftmost start of each match end, so a
+    reported match running past the last confirmed match can hide a start
+    after it. The regex searches from there in that case, and is otherwise
+    only tried at the reported starts.
+    """
+    spans = sorted(set(spans))
+    pos = reach = 0
+    i = 0
+    while True:
+        while i < len(spans) and spans[i][0] < pos:
+            reach = max(reach, spans[i][1])
+            i += 1
+
+        if reach > pos:
+            match = regex.search(data, pos)
+            if match is None:
+                return
+        elif i < len(spans):
+            match = regex.match(data, spans[i][0])
+            if match is None:
+                i += 1
+                continue
+        else:
+            return
+
+        yield match
+        pos = max(match.end(), match.start() + 1)
+
+
+# Compiled databases of a scanner and their modes, shipped with it when pickled
+_DATABASE_MODES = {
+    "_database": hyperscan.HS_MODE_BLOCK,
+    "vector_database": hyperscan.HS_MODE_VECTORED,
+    "packed_database": hyperscan.HS_MODE_BLOCK,
+}
+
+
+class Scanner:
+    """
+    Scan buffers with a set of SSSIG rules.
+
+    Every rule runs in a single hyperscan pass. Rules hyperscan can track
+    the start of match for report where each match begins, so python's re
+    only has to match the target group at those offsets. The rest report
+    once when they match at all, and python's re searches the buffer for
+    them. Filters read the buffer through memoryview slices so nothing is
+    copied until a finding is reported.
+
+    Rules that require a path (like gitleaks path only rules) are left out
+    of the database and only searched when the path passes, as gitleaks
+    does, so catch-all patterns don't report a match at every offset.
+    """
+
+    def __init__(
+        self,
+        rules: sssig.Rules,
+        flags: int = SCAN_FLAGS,
+        som: bool = True,
+        block: bool = True,
+    ) -> None:
+        self.rules = rules.rules
+        self.regexes = [
+            (compile_pattern(full_pattern(rule.target)), target_group(rule.target))
+            for rule in self.rules
+        ]
+
+        self.gated = [index for index, rule in enumerate(self.rules) if path_required(rule)]
+        self.ids = [index for index, rule in enumerate(self.rules) if not path_required(rule)]
+
+        expressions = [full_pattern(rule.target) for rule in self.rules]
+        self.som = [
+            som and index in self.ids and supports_som(expression, flags)
+            for index, expression in enumerate(expressions)
+        ]
+        self.expressions = [expressions[index].encode() for index in self.ids]
+        self.flags = [
+            (flags & ~hyperscan.HS_FLAG_SINGLEMATCH) | hyperscan.HS_FLAG_SOM_LEFTMOST
+            if self.som[index] else flags
+            for index in self.ids
+        ]
+
+        # Without block the block database is compiled on first use, for
+        # scanners that only scan packed files
+        self._database = self._compile(hyperscan.HS_MODE_BLOCK) if block else None
+        self.vector_database = None
+        self.packed_database = None
+        self.path_database = None
+        self._local = threading.local()
+
+    def __getstate__(self) -> dict:
+        # Ship the compiled databases instead of compiling them again
+        state = self.__dict__.copy()
+        for name in _DATABASE_MODES:
+            state[name] = state[name] and hyperscan.dumpb(state[name])
+        if self.path_database is not None:
+            database, rules = self.path_database
+            state["path_database"] = (database and hyperscan.dumpb(database), rules)
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for name, mode in _DATABASE_MODES.items():
+            state[name] = state[name] and hyperscan.loadb(state[name], mode)
+        if state["path_database"] is not None:
+            database, rules = state["path_database"]
+            state["path_database"] = (
+                database and hyperscan.loadb(database, hyperscan.HS_MODE_BLOCK), rules
+            )
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def database(self) -> hyperscan.Database | None:
+        """The block mode database, or None without rules to put in it."""
+        if self._database is None:
+            self._database = self._compile(hyperscan.HS_MODE_BLOCK)
+
+        return self._database
+
+    def _compile(
+        self,
+        mode: int,
+        expressions: list[bytes] | None = None,
+        flags: list[int] | None = None,
+    ) -> hyperscan.Database | None:
+        if not self.ids:
+            return None
+
+        database = hyperscan.Database(mode=mode)
+        database.compile(
+            expressions=expressions or self.expressions,
+            ids=self.ids,
+            elements=len(self.ids),
+            flags=flags or self.flags,
+        )
+        return database
+
+    def _compile_packed(self) -> hyperscan.Database | None:
+        """
+        Compile the database for packed files.
+
+        Every match end is reported, and ^, $ and the buffer anchors match
+        at every line, so each file's matches are found wherever it sits in
+        the packed buffer.
+        """
+        expressions = [_line_anchors(expression) for expression in self.expressions]
+        flags = [
+            (flag & ~hyperscan.HS_FLAG_SINGLEMATCH) | hyperscan.HS_FLAG_MULTILINE
+            for flag in self.flags
+        ]
+        return self._compile(hyperscan.HS_MODE_BLOCK, expressions, flags)
+
+    def _scratch(self, database: hyperscan.Database) -> hyperscan.Scratch:
+        """Scratch space for the calling thread."""
+        scratches = self._local.__dict__.setdefault("scratches", {})
+        if id(database) not in scratches:
+            scratches[id(database)] = hyperscan.Scratch(database)
+
+        return scratches[id(database)]
+
+    def _matches(self, database, data, profile: Profile | None) -> dict[int, list[tuple[int, int]]]:
+        """
+        Reported (start, end) spans per rule (starts are 0 for rules without SOM).
+        """
+        spans: dict[int, list[tuple[int, int]]] = {}
+
+        if profile is None:
+            def on_match(index, start, end, flags, context):
+                if index in spans:
+                    spans[index].append((start, end))
+                else:
+                    spans[index] = [(start, end)]
+        else:
+            def on_match(index, start, end, flags, context):
+                if index in spans:
+                    spans[index].append((start, end))
+                else:
+                    spans[index] = [(start, end)]
+                profile.cost(self.rules[index].id).callbacks += 1
+
+        database.scan(data, match_event_handler=on_match, scratch=self._scratch(database))
+        return spans
+
+    def matching_rules(self, data: bytes, profile: Profile | None = None) -> list[int]:
+        """
+        Indexes of the rules in the database with a match in the data.
+        """
+        if self.database is None:
+            return []
+
+        return sorted(self._matches(self.database, data, profile))
+
+    def _gated(self, path: str | None) -> dict[int, None]:
+        """Path gated rules to search for the path, without reported spans."""
+        encoded_path = (path or "").encode()
+        return {
+            index: None
+            for index in self.gated
+            if path_allowed(self.rules[index], encoded_path)
+        }
+
+    def confirm(
+        self,
+        index: int,
+        data: bytes,
+        path: str | None = None,
+        check_paths: bool = True,
+        profile: Profile | None = None,
+        spans: list[tuple[int, int]] | None = None,
+    ) -> list[Finding]:
+        """
+        Find the targets of a rule matched by hyperscan and apply its filters.
+
+        With the spans hyperscan reported the regex is mostly tried at their
+        starts, otherwise the whole buffer is searched.
+        """
+        rule = self.rules[index]
+        regex, group = self.regexes[index]
+        encoded_path = (path or "").encode() if check_paths else None
+        view = memoryview(data)
+        findings = []
+
+        # Only read the clock when profiling to keep the default path lean
+        started = time.perf_counter() if profile else 0.0
+        filter_seconds = 0.0
+        candidates = 0
+        # Matches come in order so lines are counted from the last finding
+        line, counted = 1, 0
+
+        matches = regex.finditer(data) if spans is None else _anchored(regex, data, spans)
+        for match in matches:
+            start, end = match.span(group)
+            if start < 0:
+                continue
+
+            candidates += 1
+            line_start = data.rfind(b"\n", 0, match.start()) + 1
+            line_end = data.find(b"\n", match.end())
+            if line_end < 0:
+                line_end = len(data)
+
+            target = view[start:end]
+            matched = view[match.start():match.end()]
+            context = view[line_start:line_end]
+            if profile is None:
+                kept = keep(rule.filters, encoded_path, target, matched, context)
+            else:
+                filter_started = time.perf_counter()
+                kept = keep(rule.filters, encoded_path, target, matched, context)
+                filter_seconds += time.perf_counter() - filter_started
+
+            if not kept:
+                continue
+
+            line += _count(data, b"\n", counted, start)
+            counted = start
+            findings.append(Finding(
+                rule_id=rule.id,
+                path=path,
+                line=line,
+                start=start,
+                end=end,
+                target=str(target, errors="replace"),
+                match=str(matched, errors="replace"),
+            ))
+
+        if profile is not None:
+            cost = profile.cost(rule.id)
+            cost.candidates += candidates
+            cost.rejected += candidates - len(findings)
+            cost.filter_seconds += filter_seconds
+            cost.confirm_seconds += time.perf_counter() - started - filter_seconds
+
+        return findings
+
+    def scan(
+        self,
+        data: bytes,
+        path: str | None = None,
+        profile: Profile | None = None,
+    ) -> list[Finding]:
+        """
+        Find the secrets in the data.
+        """
+        matches = self._gated(path)
+        if self.database is not None:
+            matches.update(self._matches(self.database, data, profile))
+
+        findings = []
+        for index, spans in sorted(matches.items()):
+            findings.extend(self.confirm(
+                index, data, path, profile=profile, spans=spans if self.som[index] else None,
+            ))
+
+        return findings
+
+    def scan_vector(
+        self,
+        segments: list[bytes],
+        path: str | None = None,
+        profile: Profile | None = None,
+    ) -> list[Finding]:
+        """
+        Find the secrets in several segments (e.g. diff hunks) of one input.
+
+        Hyperscan scans the segments as one stream without joining them.
+        Targets are confirmed within their own segment, so matches spanning
+        two segments are not reported. Offsets and lines count from the
+        start of the first segment.
+        """
+        if not segments:
+            return []
+
+        if self.vector_database is None and self.ids:
+            self.vector_database = self._compile(hyperscan.HS_MODE_VECTORED)
+
+        offsets = []
+        lines = []
+        offset = line = 0
+        for segment in segments:
+            offsets.append(offset)
+            lines.append(line)
+            offset += len(segment)
+            line += segment.count(b"\n")
+
+        matches = self._gated(path)
+        if self.vector_database is not None:
+            matches.update(self._matches(self.vector_database, segments, profile))
+
+        findings = []
+        for index, spans in sorted(matches.items()):
+            if self.som[index]:
+                # Spans go to the segment holding their end, and those that
+                # start in an earlier segment search the whole segment
+                by_segment: dict[int, list[tuple[int, int]] | None] = {}
+                for start, end in spans:
+                    number = bisect.bisect_right(offsets, max(start, end - 1)) - 1
+                    offset = offsets[number]
+                    if start < offset:
+                        by_segment[number] = None
+                    elif by_segment.get(number, []) is not None:
+                        by_segment.setdefault(number, []).append((start - offset, end - offset))
+            else:
+                by_segment = dict.fromkeys(range(len(segments)))
+
+            for number, segment_spans in sorted(by_segment.items()):
+                for finding in self.confirm(
+                    index, segments[number], path, profile=profile, spans=segment_spans,
+                ):
+                    finding.start += offsets[number]
+                    finding.end += offsets[number]
+                    finding.line += lines[number]
+                    findings.append(finding)
+
+        return findings
+
+    def _compile_paths(self) -> tuple[hyperscan.Database | None, list[int]]:
+        """
+        Compile the path patterns of the path gated rules into one database.
+
+        Returns it with the rule each expression belongs to.
+        """
+        expressions = []
+        rules = []
+        for index in self.gated:
+            for f in self.rules[index].filters or ():
+                if isinstance(f, sssig.RequireFilter):
+                    for pattern in f.path_patterns or ():
+                        expressions.append(_line_anchors(pattern.encode()))
+                        rules.append(index)
+
+        if not expressions:
+            return None, rules
+
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_ALLOWEMPTY,
+        )
+        return database, rules
+
+    def prepare_packed(self) -> None:
+        """Compile the databases scan_packed uses if they aren't yet."""
+        if self.packed_database is None and self.ids:
+            self.packed_database = self._compile_packed()
+        if self.path_database is None:
+            self.path_database = self._compile_paths()
+
+    def _gated_packed(self, paths: list[str | None]) -> list[tuple[int, int]]:
+        """
+        The (path, rule) pairs of path gated rules whose paths pass.
+
+        The paths are scanned in one pass for the rules' path patterns and
+        only the paths with a match are checked in full. Files without a
+        path aren't checked, so every path gated rule is kept for them.
+        """
+        self.prepare_packed()
+        database, rules = self.path_database
+
+        # Rules that only check path strings have to check every path
+        candidates = {
+            (number, index)
+            for index in set(self.gated) - set(rules)
+            for number in range(len(paths))
+        } | {
+            (number, index)
+            for number, path in enumerate(paths) if path is None
+            for index in self.gated
+        }
+        if database is not None:
+            offsets = []
+            offset = 0
+            for path in paths:
+                offsets.append(offset)
+                offset += len((path or "").encode()) + 1
+
+            def on_match(id, start, end, flags, context):
+                candidates.add((bisect.bisect_right(offsets, max(start, end - 1)) - 1, rules[id]))
+
+            database.scan(
+                "\n".join(path or "" for path in paths).encode(),
+                match_event_handler=on_match,
+                scratch=self._scratch(database),
+            )
+
+        return [
+            (number, index)
+            for number, index in candidates
+            if paths[number] is None or path_allowed(self.rules[index], paths[number].encode())
+        ]
+
+    def match_packed(
+        self,
+        files: list[tuple[str | None, bytes]],
+        profile: Profile | None = None,
+    ) -> dict[tuple[int, int], list[tuple[int, int]] | None]:
+        """
+        Find the rules to confirm in many (path, data) files with one
+        hyperscan call.
+
+        The files are packed into one buffer and each match is mapped back
+        to its file through the sorted file offsets. The packed database
+        finds at least every match of each file. Returns the reported spans
+        in the file per (file, rule), or None to search the whole file.
+        """
+        self.prepare_packed()
+
+        offsets = []
+        offset = 0
+        for _, data in files:
+            offsets.append(offset)
+            offset += len(data) + len(PACK_SEPARATOR)
+
+        hits: dict[tuple[int, int], list[tuple[int, int]] | None] = dict.fromkeys(
+            self._gated_packed([path for path, _ in files])
+        )
+
+        if self.packed_database is not None:
+            matches = []
+
+            def on_match(index, start, end, flags, context):
+                matches.append((index, start, end))
+
+            self.packed_database.scan(
+                PACK_SEPARATOR.join(data for _, data in files),
+                match_event_handler=on_match,
+                scratch=self._scratch(self.packed_database),
+            )
+
+            for index, start, end in matches:
+                number = bisect.bisect_right(offsets, max(start, end - 1)) - 1
+                key = (number, index)
+                if self.som[index] and start >= offsets[number]:
+                    if hits.get(key, []) is not None:
+                        hits.setdefault(key, []).append((start - offsets[number], end - offsets[number]))
+                else:
+                    # Without a start in this file, search all of it
+                    hits[key] = None
+
+            if profile is not None:
+                for index, _, _ in matches:
+                    profile.cost(self.rules[index].id).callbacks += 1
+
+        return hits
+
+    def scan_packed(
+        self,
+        files: list[tuple[str | None, bytes]],
+        profile: Profile | None = None,
+    ) -> list[Finding]:
+        """
+        Find the secrets in many (path, data) files with one hyperscan call.
+
+        Targets are confirmed within their own file, so path filters,
+        offsets and lines are the same as scanning the files one at a time.
+        Path filters aren't checked for files without a path. See
+        match_packed.
+        """
+        findings = []
+        for (number, index), spans in sorted(self.match_packed(files, profile).items()):
+            path, data = files[number]
+            findings.extend(self.confirm(
+                index, data, path, check_paths=path is not None, profile=profile, spans=spans,
+            ))
+
+        return findings
+
+
+def scan_paths(
+    scanner: Scanner,
+    paths: list[Path],
+    profile: Profile | None = None,
+    pack_size: int = 0,
+) -> list[Finding]:
+    """
+    Scan files one at a time, or pack the files smaller than pack_size
+    into shared scans of about pack_size bytes.
+
+    Files of MMAP_SIZE bytes or more are memory mapped instead of read.
+    """
+    findings = []
+    packed: list[tuple[str, bytes]] = []
+    packed_size = 0
+    for path in paths:
+        # Plain file descriptors skip building a buffered file per file
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            if size >= MMAP_SIZE:
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as data:
+                    findings.extend(scanner.scan(data, str(path), profile))
+                continue
+
+            data = os.read(fd, size)
+        finally:
+            os.close(fd)
+
+        if size >= pack_size:
+            findings.extend(scanner.scan(data, str(path), profile))
+            continue
+
+        packed.append((str(path), data))
+        packed_size += size + len(PACK_SEPARATOR)
+        if packed_size >= pack_size:
+            findings.extend(scanner.scan_packed(packed, profile))
+            packed, packed_size = [], 0
+
+    if packed:
+        findings.extend(scanner.scan_packed(packed, profile))
+
+    return findings
+
+
+def walk(paths: list[Path]) -> list[Path]:
+    """Files under the paths, in a stable order."""
+    files = []
+    for path in paths:
+        if path.is_file():
+            files.append(path)
+        else:
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file()))
+
+    return files
+
+
+# Scanner of each worker process, built once by _init_worker
+_scanner: Scanner | None = None
+
+
+def _init_worker(scanner: Scanner) -> None:
+    global _scanner
+    _scanner = scanner
+
+
+def _scan_files(
+    paths: list[Path], profiled: bool, pack_size: int
+) -> tuple[list[Finding], Profile | None]:
+    profile = Profile() if profiled else None
+    return scan_paths(_scanner, paths, profile, pack_size), profile
+
+
+def scan_files(
+    rules: sssig.Rules,
+    paths: list[Path],
+    workers: int = 1,
+    profile: Profile | None = None,
+    som: bool = True,
+    pack_size: int = 0,
+) -> list[Finding]:
+    """
+    Scan files, spread over a process pool when workers > 1.
+
+    The databases the files need are compiled once and shipped to the
+    workers serialized. Each worker profiles into its own counters, which
+    are merged into profile at the end. See scan_paths for pack_size.
+    """
+    # Files at least this large are scanned on their own
+    alone = min(pack_size, MMAP_SIZE) if pack_size else 0
+    sizes = [path.stat().st_size for path in paths] if pack_size else []
+    scanner = Scanner(rules, som=som, block=not pack_size or any(size >= alone for size in sizes))
+    if workers <= 1 or len(paths) <= 1:
+        return scan_paths(scanner, paths, profile, pack_size)
+
+    if any(size < alone for size in sizes):
+        scanner.prepare_packed()
+
+    chunks = [paths[i::workers] for i in range(workers)]
+
+    findings = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scanner,)) as executor:
+        for chunk_findings, chunk_profile in executor.map(
+            _scan_files, chunks, [profile is not None] * workers, [pack_size] * workers
+        ):
+            findings.extend(chunk_findings)
+            if profile is not None:
+                profile.merge(chunk_profile)
+
+    return findings
+
+
+def new_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="gl2s3ig-scan",
+        description="Scan files for secrets with SSSIG rules",
+    )
+    parser.add_argument(
+        "rules", type=Path, help="SSSIG rules.yaml or gitleaks config.toml"
+    )
+    parser.add_argument(
+        "paths", type=Path, nargs="+", help="files or directories to scan"
+    )
+    parser.add_argument(
+        "--default-config",
+        type=Path,
+        help="gitleaks config used by [extend] useDefault",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="worker processes (default: 1)"
+    )
+    parser.add_argument(
+        "--no-som",
+        dest="som",
+        action="store_false",
+        help="skip start of match tracking for faster database compiles",
+    )
+    parser.add_argument(
+        "--pack-size",
+        type=int,
+        default=0,
+        help="pack files smaller than this many bytes into shared scans of about "
+        "this size (default: 0, scan files one at a time)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="report the most expensive rules"
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="rules in the profile report (default: 20)"
+    )
+    parser.add_argument(
+        "--metrics", type=Path, help="write per-rule Prometheus metrics to a file"
+    )
+    return parser
+
+
+def main() -> None:
+    args = new_parser().parse_args()
+    rules = translate.load_rules(args.rules, args.default_config)
+    profile = Profile() if args.profile or args.metrics else None
+
+    started = time.perf_counter()
+    findings = scan_files(rules, walk(args.paths), args.workers, profile, args.som, args.pack_size)
+    seconds = time.perf_counter() - started
+
+    for finding in findings:
+        print(f"{finding.path}:{finding.line}: {finding.rule_id}: {finding.target!r}")
+
+    print(f"Found {len(findings)} secrets in {seconds:.3f}s")
+
+    if args.profile:
+        print(f"{'rule':20} {'seconds':>9} {'callbacks':>9} {'candidates':>10} {'rejected':>8} {'findings':>8}")
+        for rule_id, cost in profile.ranked()[:args.top]:
+            print(
+                f"{rule_id:20} {cost.seconds:9.4f} {cost.callbacks:9} "
+                f"{cost.candidates:10} {cost.rejected:8} {cost.findings:8}"
+            )
+
+    if args.metrics:
+        args.metrics.write_text(profile.to_prometheus())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!./.venv/bin/python3
+"""
+Check rules against their positive and negative examples.
+
+Every example is packed into one buffer and scanned with every rule in a
+single hyperscan pass, as the scanner packs small files. Each candidate
+is then confirmed on its own example and the rule filters are applied.
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from pydantic import BaseModel
+
+import scan
+import sssig
+import translate
+
+
+class Failure(BaseModel):
+    rule_id: str
+    example: str
+    # True for a positive example that didn't match, False for a negative
+    # example that did
+    positive: bool
+
+
+class Report(BaseModel):
+    rules: int
+    examples: int
+    failures: list[Failure]
+    seconds: float
+
+
+def run(rules: sssig.Rules) -> Report:
+    """
+    Run every rule against the examples of every rule.
+    """
+    started = time.perf_counter()
+
+    # Every rule's examples, in the order they're packed
+    examples: list[tuple[int, bytes, bool]] = []
+    for index, rule in enumerate(rules.rules):
+        if rule.meta.examples is None:
+            continue
+
+        for example in rule.meta.examples.positive or ():
+            examples.append((index, example.encode(), True))
+        for example in rule.meta.examples.negative or ():
+            examples.append((index, example.encode(), False))
+
+    failures = []
+    if examples:
+        scanner = scan.Scanner(rules, som=False, block=False)
+        # Examples have no path so path features are not checked
+        hits = scanner.match_packed([(None, example) for _, example, _ in examples])
+
+        for position, (index, example, positive) in enumerate(examples):
+            matched = (position, index) in hits and bool(
+                scanner.confirm(index, example, check_paths=False, spans=hits[position, index])
+            )
+            if matched != positive:
+                failures.append(Failure(
+                    rule_id=rules.rules[index].id,
+                    example=example.decode(),
+                    positive=positive,
+                ))
+
+    return Report(
+        rules=len(rules.rules),
+        examples=len(examples),
+        failures=failures,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def new_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="gl2s3ig-selftest",
+        description="Check SSSIG rules against their examples",
+    )
+    parser.add_argument(
+        "src", type=Path, help="SSSIG rules.yaml or gitleaks config.toml"
+    )
+    parser.add_argument(
+        "--default-config",
+        type=Path,
+        help="gitleaks config used by [extend] useDefault",
+    )
+    return parser
+
+
+def main() -> None:
+    args = new_parser().parse_args()
+    report = run(translate.load_rules(args.src, args.default_config))
+
+    for failure in report.failures:
+        expected = "positive did not match" if failure.positive else "negative matched"
+        print(f"{failure.rule_id}: {expected}: {failure.example!r}")
+
+    print(
+        f"Checked {report.examples} examples against {report.rules} rules "
+        f"in {report.seconds:.3f}s: {len(report.failures)} failures"
+    )
+    sys.exit(1 if report.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import enum
 
 from enum import StrEnum
+from functools import cache
 from typing import Annotated
+from typing import TextIO
 from typing import Union
 from typing import Literal
 
@@ -11,6 +13,8 @@ from pydantic import BeforeValidator
 from pydantic import Field
 from pydantic import HttpUrl
 
+import yaml
+
 import hscheck  # type: ignore
 
 
@@ -27,11 +31,19 @@ def ensure_valid_range(value: int | list[int]) -> list[int]:
     return value
 
 
+@cache
+def validate_pattern(raw_pattern: str) -> str:
+    """
+    Compile-check a pattern with hyperscan once per unique pattern
+    """
+    return hscheck.validate_pattern(raw_pattern)
+
+
 def is_valid_hs_pattern(raw_pattern: str) -> str:
     """
     Make sure the pattern is a valid hyperscan pattern
     """
-    err = hscheck.validate_pattern(raw_pattern)
+    err = validate_pattern(raw_pattern)
     if err:
         raise ValueError(err)
 
@@ -209,3 +221,43 @@ class Rule(BaseModel):
 
 class Rules(BaseModel):
     rules: list[Rule]
+
+
+def share_filters(data: dict) -> dict:
+    """
+    Point identical filters and pattern lists in dumped rules at one object.
+
+    YAML dumpers emit shared objects once as an anchor and then reference
+    it by id, so downstream engines can compile each unique filter once.
+    """
+    seen: dict[str, object] = {}
+
+    def share(value):
+        if isinstance(value, list):
+            value = [share(item) for item in value]
+        elif isinstance(value, dict):
+            value = {key: share(item) for key, item in value.items()}
+        else:
+            return value
+
+        return seen.setdefault(repr(value), value)
+
+    for rule in data.get("rules", []):
+        if rule.get("filters"):
+            rule["filters"] = [share(f) for f in rule["filters"]]
+
+    return data
+
+
+def load(fp: TextIO) -> Rules:
+    """Load SSSIG rules from YAML."""
+    return Rules.model_validate(yaml.safe_load(fp))
+
+
+def dump(rules: Rules, fp: TextIO, shared: bool = False) -> None:
+    """Write SSSIG rules as YAML, optionally sharing identical filters."""
+    data = rules.model_dump(mode="json", exclude_none=True)
+    if shared:
+        data = share_filters(data)
+
+    yaml.dump(data, fp, default_flow_style=False, sort_keys=False)
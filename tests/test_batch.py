@@ -0,0 +1,103 @@
+import yaml
+
+import batch
+import gitleaks
+import translate
+
+
+def test_find_configs_directory(tmp_path):
+    """Test that a directory lists its toml configs in order."""
+    for name in ("b.toml", "a.toml", "notes.txt"):
+        (tmp_path / name).write_text("")
+
+    assert batch.find_configs(tmp_path) == [tmp_path / "a.toml", tmp_path / "b.toml"]
+
+
+def test_find_configs_manifest(tmp_path):
+    """Test that a manifest lists configs relative to itself."""
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# teams\nteams/a.toml\n\nb.toml\n")
+
+    assert batch.find_configs(manifest) == [tmp_path / "teams/a.toml", tmp_path / "b.toml"]
+
+
+def test_translate_rules_interns_worker_rules():
+    """Test that rules from the workers are interned into the given pool."""
+    rules = [
+        gitleaks.Rule(id=name, regex=r"key=(\w+)", allowlists=[gitleaks.Allowlist(stopwords=["example"])])
+        for name in ("a", "b")
+    ]
+    pool = translate.PatternPool()
+
+    translated = batch.translate_rules(rules, workers=2, pool=pool)
+
+    assert translated[0].target.pattern is translated[1].target.pattern
+    assert translated[0].filters[0].target_strings[0] is translated[1].filters[0].target_strings[0]
+    assert (pool.string_count, pool.unique_string_count) == (6, 3)
+
+
+def test_convert(tmp_path):
+    """Test converting configs that extend a shared base."""
+    (tmp_path / "base.toml").write_text('[[rules]]\nid = "base"\nregex = "base"\n')
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.toml").write_text(
+            f'[extend]\npath = "base.toml"\n\n[[rules]]\nid = "{name}"\nregex = "{name}"\n'
+        )
+
+    paths = [tmp_path / "a.toml", tmp_path / "b.toml"]
+    summary = batch.convert(paths, tmp_path / "out", workers=1)
+
+    assert summary.total_rules == 4
+    assert summary.unique_rules == 3
+    assert [c.rules for c in summary.configs] == [2, 2]
+
+    with (tmp_path / "out" / "a.yaml").open() as fp:
+        data = yaml.safe_load(fp)
+
+    assert [r["target"]["pattern"] for r in data["rules"]] == ["base", "a"]
+
+
+def test_convert_keep_going(tmp_path):
+    """Test that failed rules are reported per config and the rest are written."""
+    (tmp_path / "a.toml").write_text(
+        '[[rules]]\nid = "good"\nregex = "good"\n\n'
+        '[[rules]]\nid = "no-group"\nregex = "abc"\nsecretGroup = 2\n\n'
+        '[[rules]]\nid = "invalid"\nregex = "(?<=x)y"\n'
+    )
+
+    summary = batch.convert([tmp_path / "a.toml"], tmp_path / "out", workers=1, keep_going=True)
+
+    assert summary.configs[0].rules == 1
+    assert [f.rule_id for f in summary.configs[0].failures] == ["invalid", "no-group"]
+
+
+def test_convert_keep_going_shared_base(tmp_path):
+    """Test that failed rules in a shared base are reported for every config."""
+    (tmp_path / "base.toml").write_text('[[rules]]\nid = "invalid"\nregex = "(?<=x)y"\n')
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.toml").write_text(
+            f'[extend]\npath = "base.toml"\n\n[[rules]]\nid = "{name}"\nregex = "{name}"\n'
+        )
+
+    paths = [tmp_path / "a.toml", tmp_path / "b.toml"]
+    summary = batch.convert(paths, tmp_path / "out", workers=1, keep_going=True)
+
+    assert [c.rules for c in summary.configs] == [1, 1]
+    assert [[f.rule_id for f in c.failures] for c in summary.configs] == [["invalid"], ["invalid"]]
+
+
+def test_convert_keep_going_config_errors(tmp_path):
+    """Test that configs that fail to load are reported and the rest converted."""
+    (tmp_path / "a.toml").write_text('[[rules]]\nid = "a"\nregex = "a"\n')
+    (tmp_path / "b.toml").write_text("[[rules]\n")
+    (tmp_path / "c.toml").write_text('[extend]\npath = "missing.toml"\n')
+    (tmp_path / "d.toml").write_text("[extend]\nuseDefault = true\n")
+
+    paths = [tmp_path / f"{name}.toml" for name in "abcd"]
+    summary = batch.convert(paths, tmp_path / "out", workers=1, keep_going=True)
+
+    assert [c.rules for c in summary.configs] == [1, 0, 0, 0]
+    assert summary.configs[0].error is None
+    assert all(c.error for c in summary.configs[1:])
+    assert "useDefault" in summary.configs[3].error
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["a.yaml"]
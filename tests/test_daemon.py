@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+
+import daemon
+
+
+def test_histogram():
+    """Test that latencies land in cumulative buckets."""
+    histogram = daemon.Histogram()
+    histogram.observe(0.0001)
+    histogram.observe(0.003)
+    histogram.observe(10)
+
+    data = histogram.to_dict()
+    assert data["count"] == 3
+    assert data["buckets"]["0.0005"] == 1
+    assert data["buckets"]["0.005"] == 2
+    assert data["buckets"]["2.5"] == 2
+    assert data["buckets"]["+Inf"] == 3
+
+
+def test_rebuild_on_change(tmp_path):
+    """Test that only changed rules are translated again on rebuild."""
+    src = tmp_path / "config.toml"
+    src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n')
+
+    server = daemon.Daemon(src)
+    server.rebuild()
+    first = server.rules.rules[0]
+    assert not server.changed()
+
+    src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n\n[[rules]]\nid = "b"\nregex = "b=(\\\\d+)"\n')
+    os.utime(src, (0, 0))
+    assert server.changed()
+
+    server.rebuild()
+    assert len(server.rules.rules) == 2
+    assert server.rules.rules[0] is first
+
+
+def test_watch_keeps_rules_on_bad_pattern(tmp_path):
+    """Test that a pattern python's re rejects doesn't stop the watcher."""
+    src = tmp_path / "config.toml"
+    src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n')
+
+    server = daemon.Daemon(src)
+    server.rebuild()
+    rules = server.rules
+
+    async def edit():
+        watcher = asyncio.create_task(server.watch(0.01))
+        src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\Qx.y\\\\E\\\\d+)"\n')
+        os.utime(src, (0, 0))
+        await asyncio.sleep(0.2)
+        assert not watcher.done()
+        watcher.cancel()
+
+    asyncio.run(edit())
+    assert server.rules is rules
+
+
+def test_watch_rebuilds_recreated_config(tmp_path):
+    """Test that a config missing for a poll is rebuilt once it's back."""
+    src = tmp_path / "config.toml"
+    src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n')
+
+    server = daemon.Daemon(src)
+    server.rebuild()
+
+    async def replace():
+        watcher = asyncio.create_task(server.watch(0.01))
+        src.unlink()
+        await asyncio.sleep(0.1)
+        assert server.mtimes == {src.resolve(): None}
+
+        src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n\n[[rules]]\nid = "b"\nregex = "b=(\\\\d+)"\n')
+        await asyncio.sleep(0.2)
+        watcher.cancel()
+
+    asyncio.run(replace())
+    assert len(server.rules.rules) == 2
+
+
+def test_handle_records_known_routes(tmp_path):
+    """Test that latency is only labelled with known routes."""
+    src = tmp_path / "config.toml"
+    src.write_text("")
+    server = daemon.Daemon(src)
+
+    class Writer:
+        def write(self, data):
+            pass
+
+        async def drain(self):
+            pass
+
+        def close(self):
+            pass
+
+    async def request(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        await server.handle(reader, Writer())
+
+    asyncio.run(request(b"GET /stats HTTP/1.1\r\n\r\n"))
+    asyncio.run(request(b'GET /x"}\n HTTP/1.1\r\n\r\n'))
+    asyncio.run(request(b"POST /nope HTTP/1.1\r\nContent-Length: x\r\n\r\n"))
+
+    assert sorted(server.latency) == ["GET /stats", "invalid"]
+    assert server.latency["invalid"].to_dict()["count"] == 2
+
+
+def test_route_scan(tmp_path):
+    """Test scanning through the request router."""
+    src = tmp_path / "config.toml"
+    src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n')
+    server = daemon.Daemon(src)
+    server.rebuild()
+
+    status, content_type, body = asyncio.run(server.route("POST", "/scan?path=x.py", b"a=123"))
+
+    assert status == 200
+    assert content_type == "application/json"
+    findings = json.loads(body)
+    assert findings[0]["target"] == "123"
+    assert findings[0]["path"] == "x.py"
+
+
+def test_route_not_found(tmp_path):
+    """Test that unknown routes are rejected."""
+    server = daemon.Daemon(tmp_path / "config.toml")
+
+    status, _, _ = asyncio.run(server.route("GET", "/missing", b""))
+
+    assert status == 404
+
+
+def test_route_metrics(tmp_path):
+    """Test that scans are profiled and exported as Prometheus metrics."""
+    src = tmp_path / "config.toml"
+    src.write_text('[[rules]]\nid = "a"\nregex = "a=(\\\\d+)"\n')
+    server = daemon.Daemon(src)
+    server.rebuild()
+    server.latency["POST /scan"] = daemon.Histogram()
+    server.latency["POST /scan"].observe(0.002)
+
+    asyncio.run(server.route("POST", "/scan", b"a=123"))
+    status, content_type, body = asyncio.run(server.route("GET", "/metrics", b""))
+
+    assert status == 200
+    assert content_type.startswith("text/plain")
+    metrics = body.decode()
+    assert 'gl2s3ig_request_seconds_bucket{route="POST /scan",le="0.0025"} 1' in metrics
+    assert 'gl2s3ig_request_seconds_count{route="POST /scan"} 1' in metrics
+    assert f'gl2s3ig_rule_findings_total{{rule_id="{server.rules.rules[0].id}"}} 1' in metrics
@@ -0,0 +1,91 @@
+import differential
+import gitleaks
+
+
+def test_reference_secret_group():
+    """Test that the reference picks the secret the way gitleaks does."""
+    reference = differential.Reference(gitleaks.Config(rules=[
+        gitleaks.Rule(id="first", regex=r"(a)?(key)=(\w+)", keywords=["key"]),
+        gitleaks.Rule(id="group", regex=r"(key)=(\w+)", secretGroup=2),
+    ]))
+
+    findings = reference.scan(b"key=abc", "a.py")
+
+    assert [f.target for f in findings] == ["key", "abc"]
+
+
+def test_reference_keywords_and_allowlists():
+    """Test that keywords and allowlists drop findings."""
+    reference = differential.Reference(gitleaks.Config(rules=[
+        gitleaks.Rule(id="kw", regex=r"\d{4}", keywords=["pin"]),
+        gitleaks.Rule(
+            id="allow",
+            regex=r"key=(\w+)",
+            allowlists=[gitleaks.Allowlist(
+                condition=gitleaks.AllowlistCondition.AND,
+                paths=[r"\.md$"],
+                stopwords=["example"],
+            )],
+        ),
+    ]))
+
+    assert reference.scan(b"1234", "a.py") == []
+    assert [f.target for f in reference.scan(b"PIN 1234", "a.py")] == ["1234"]
+    assert reference.scan(b"key=example", "a.md") == []
+    assert [f.target for f in reference.scan(b"key=example", "a.py")] == ["example"]
+
+
+def test_reference_global_allowlists():
+    """Test that global allowlists drop findings of the rules they target."""
+    reference = differential.Reference(gitleaks.Config(
+        allowlists=[
+            gitleaks.Allowlist(paths=["vendor"]),
+            gitleaks.Allowlist(targetRules=["key"], stopwords=["example"]),
+        ],
+        rules=[
+            gitleaks.Rule(id="key", regex=r"key=(\w+)"),
+            gitleaks.Rule(id="token", regex=r"token=(\w+)"),
+            gitleaks.Rule(id="env", path=r"\.env$"),
+        ],
+    ))
+
+    assert reference.scan(b"key=abc token=abc", "vendor/a.py") == []
+    assert reference.scan(b"", "vendor/.env") == []
+    assert [f.target for f in reference.scan(b"key=example token=example", "a.py")] == ["example"]
+
+
+def test_run(tmp_path):
+    """Test comparing both sides over a corpus."""
+    (tmp_path / "a.py").write_text("key=abcd\ntoken=skip\n")
+    config = gitleaks.Config(rules=[
+        gitleaks.Rule(id="key", regex=r"key=(\w+)"),
+        # An allowlist without a regexTarget applies to the secret in
+        # gitleaks, but the translation drops its regexes
+        gitleaks.Rule(
+            id="token",
+            regex=r"token=(\w+)",
+            allowlists=[gitleaks.Allowlist(regexes=["skip"])],
+        ),
+    ])
+
+    report = differential.run(config, tmp_path)
+
+    assert report.files == 1
+    assert report.reference_findings == 1
+    assert report.translated_findings == 2
+    assert [(d.gitleaks_id, len(d.missing), len(d.extra)) for d in report.diffs] == [("token", 0, 1)]
+
+
+def test_run_global_allowlist(tmp_path):
+    """Test that dropped global allowlists show up as extra findings."""
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "a.py").write_text("key=abcd\n")
+    config = gitleaks.Config(
+        allowlists=[gitleaks.Allowlist(paths=["vendor"])],
+        rules=[gitleaks.Rule(id="key", regex=r"key=(\w+)")],
+    )
+
+    report = differential.run(config, tmp_path)
+
+    assert report.reference_findings == 0
+    assert [(d.gitleaks_id, len(d.missing), len(d.extra)) for d in report.diffs] == [("key", 0, 1)]
@@ -1,3 +1,5 @@
+import pytest
+
 import gitleaks
 
 
@@ -8,6 +10,9 @@ def test_load_gitleaks_config():
 
     assert isinstance(config, gitleaks.Config)
     assert len(config.rules) > 0
+    assert len(config.allowlists) == 1
+    assert config.allowlists[0].regexTarget == gitleaks.RegexTarget.LINE
+    assert "vendor" in config.allowlists[0].paths
 
 
 def test_gitleaks_rule_basic_fields():
@@ -121,3 +126,96 @@ def test_gitleaks_rule_with_required():
 
         assert isinstance(req, gitleaks.Required)
         assert req.id is not None
+
+
+def test_load_path_resolves_extend(tmp_path):
+    """Test that [extend] configs are merged over their base config."""
+    (tmp_path / "base.toml").write_text("""
+[[rules]]
+id = "kept"
+regex = "kept"
+tags = ["base"]
+
+[[rules]]
+id = "disabled"
+regex = "disabled"
+""")
+    (tmp_path / "team.toml").write_text("""
+[extend]
+path = "base.toml"
+disabledRules = ["disabled"]
+
+[[rules]]
+id = "kept"
+description = "Kept"
+tags = ["team"]
+
+[[rules]]
+id = "added"
+regex = "added"
+""")
+
+    config = gitleaks.load_path(tmp_path / "team.toml")
+
+    assert [r.id for r in config.rules] == ["kept", "added"]
+    kept = config.rules[0]
+    assert kept.regex == "kept"
+    assert kept.description == "Kept"
+    assert kept.tags == ["base", "team"]
+
+
+def test_load_path_extends_global_allowlists(tmp_path):
+    """Test that global allowlists are added to the ones of the base config."""
+    (tmp_path / "base.toml").write_text('[allowlist]\npaths = ["vendor"]\n')
+    (tmp_path / "team.toml").write_text(
+        '[extend]\npath = "base.toml"\n\n'
+        '[[allowlists]]\ntargetRules = ["key"]\nstopwords = ["example"]\n'
+    )
+
+    config = gitleaks.load_path(tmp_path / "team.toml")
+
+    assert [a.paths for a in config.allowlists] == [["vendor"], None]
+    assert config.allowlists[1].targetRules == ["key"]
+
+
+def test_load_path_shares_base(tmp_path):
+    """Test that a base config is only loaded once through the cache."""
+    (tmp_path / "base.toml").write_text('[[rules]]\nid = "base"\nregex = "base"\n')
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.toml").write_text('[extend]\npath = "base.toml"\n')
+
+    cache = {}
+    gitleaks.load_path(tmp_path / "a.toml", cache=cache)
+    gitleaks.load_path(tmp_path / "b.toml", cache=cache)
+
+    assert len(cache) == 3
+    assert cache[(tmp_path / "base.toml").resolve()].rules[0].id == "base"
+
+
+def test_load_path_circular_extend(tmp_path):
+    """Test that circular [extend] chains are rejected."""
+    (tmp_path / "a.toml").write_text('[extend]\npath = "b.toml"\n')
+    (tmp_path / "b.toml").write_text('[extend]\npath = "a.toml"\n')
+
+    with pytest.raises(ValueError, match="circular extend"):
+        gitleaks.load_path(tmp_path / "a.toml")
+
+
+def test_load_path_collects_rule_failures(tmp_path):
+    """Test that invalid rules are recorded and left out when failures are collected."""
+    (tmp_path / "base.toml").write_text('[[rules]]\nid = "base"\nregex = "(?<=x)y"\n')
+    (tmp_path / "config.toml").write_text(
+        '[extend]\npath = "base.toml"\n\n'
+        '[[rules]]\nid = "good"\nregex = "good"\n\n'
+        '[[rules]]\nid = "bad"\nregex = "good"\nentropy = -1\n'
+    )
+
+    with pytest.raises(ValueError):
+        gitleaks.load_path(tmp_path / "config.toml")
+
+    failures = []
+    config = gitleaks.load_path(tmp_path / "config.toml", failures=failures)
+
+    assert [rule.id for rule in config.rules] == ["good"]
+    assert [failure.rule_id for failure in failures] == ["bad", "base"]
+    assert failures[0].reason.startswith("entropy: ")
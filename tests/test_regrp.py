@@ -0,0 +1,51 @@
+import re
+
+import regrp
+
+
+def test_split_regexp():
+    """Test splitting a regexp around its first capture group."""
+    assert regrp.split_regexp(0, r"key=(\w+);") == ("key=", r"\w+", ";")
+    assert regrp.split_regexp(0, r"\w+") == ("", r"\w+", "")
+
+
+def test_to_python_scopes_inline_flags():
+    """Test that inline flags are scoped to the rest of their group."""
+    assert regrp.to_python(r"(\bSK(?i)[0-9a-f]{4}\b)") == r"(\bSK(?i:[0-9a-f]{4}\b))"
+    assert regrp.to_python(r"(?i)key(?-i)VALUE") == r"(?i:key)VALUE"
+    assert regrp.to_python(r"(?:a(?i)b|c)") == r"(?:a(?i:b)|(?i:c))"
+    assert regrp.to_python(r"(?i:x)y") == r"(?i:x)y"
+
+    regex = re.compile(regrp.to_python(r"sk(?i)ab"))
+    assert regex.fullmatch("skAB")
+    assert not regex.fullmatch("SKab")
+
+
+def test_to_python_end_of_text():
+    """Test that \\z is rewritten to python's end of text anchor."""
+    assert regrp.to_python(r"abc\z") == r"abc\Z"
+
+
+def test_count_groups():
+    """Test counting capture groups, including nested ones."""
+    assert regrp.count_groups(r"(?i)a(?:b)(c(d))") == 2
+    assert regrp.count_groups(r"abc") == 0
+
+
+def test_scope_flags_around_capture_groups():
+    """Test that inline flags are carried into the capture groups after them."""
+    regexp = r"(?i)key=([a-z]+)\b"
+    scoped = regrp.scope_flags(regexp)
+
+    assert scoped == r"(?i:key=)((?i:[a-z]+))(?i:\b)"
+    assert regrp.split_regexp(1, scoped) == (r"(?i:key=)", r"(?i:[a-z]+)", r"(?i:\b)")
+    assert regrp.scope_flags(r"(?:x(?:key)?|y)") == r"(?:x(?:key)?|y)"
+
+
+def test_scope_flags_is_equivalent():
+    """Test that patterns with scoped flags match the same text."""
+    text = "AKIA Access=x auth AUTH secretsauce sk ABC"
+    for regexp in (r"(?i)(access|auth)\b", r"(?:AKIA|ASIA|A3T[A-Z])", r"(?:secret|sauce)+", r"s(?i)k\s(abc)"):
+        expected = [m.span() for m in re.finditer(regrp.to_python(regexp), text)]
+        actual = [m.span() for m in re.finditer(regrp.to_python(regrp.scope_flags(regexp)), text)]
+        assert actual == expected
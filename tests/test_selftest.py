@@ -0,0 +1,56 @@
+import selftest
+import sssig
+import translate
+
+
+def new_rule(name: str, pattern: str, positive: list[str], negative: list[str], **target) -> sssig.Rule:
+    return sssig.Rule(
+        id=translate.generate_sssig_id(name),
+        meta=sssig.RuleMeta(
+            name=name,
+            examples=sssig.Examples(positive=positive, negative=negative),
+        ),
+        target=sssig.Target(pattern=pattern, **target),
+    )
+
+
+def test_run_passes():
+    """Test that rules matching their examples have no failures."""
+    rules = sssig.Rules(rules=[
+        new_rule("digits", r"[0-9]{4}", ["id 1234"], ["id 12"]),
+        new_rule("start", r"[a-z]+", ["key abc"], ["abc"], prefix_pattern=r"^key "),
+        new_rule("anchored", r"[a-z]+", ["key abc"], ["nokey abc"], prefix_pattern=r"\Akey "),
+    ])
+
+    report = selftest.run(rules)
+
+    assert report.rules == 3
+    assert report.examples == 6
+    assert report.failures == []
+
+
+def test_run_reports_failures():
+    """Test that missed positives and matched negatives are reported."""
+    rules = sssig.Rules(rules=[
+        new_rule("digits", r"[0-9]{4}", ["id 12"], ["id 1234"]),
+    ])
+
+    report = selftest.run(rules)
+
+    assert [(f.example, f.positive) for f in report.failures] == [("id 12", True), ("id 1234", False)]
+
+
+def test_run_applies_filters():
+    """Test that filters apply to the examples."""
+    rule = new_rule("key", r"\w+", ["key=abc"], ["key=example"], prefix_pattern="key=")
+    rule.filters = [sssig.ExcludeFilter(kind=sssig.FilterKind.EXCLUDE, target_strings=["example"])]
+
+    assert selftest.run(sssig.Rules(rules=[rule])).failures == []
+
+
+def test_run_skips_path_features():
+    """Test that examples match path gated rules without a path."""
+    rule = new_rule("env", r"\w+", ["token=abc"], ["abc"], prefix_pattern="token=", suffix_pattern=r"\z")
+    rule.filters = [sssig.RequireFilter(kind=sssig.FilterKind.REQUIRE, path_patterns=[r"\.env$"])]
+
+    assert selftest.run(sssig.Rules(rules=[rule])).failures == []
@@ -205,3 +205,99 @@ def test_translate_config():
     assert isinstance(sssig_rules, sssig.Rules)
     assert len(sssig_rules.rules) == 2
     assert all(r.id.startswith("S3IG") for r in sssig_rules.rules)
+
+
+def test_pattern_pool_interns_strings():
+    """Test that identical allowlists share their strings and are counted."""
+    pool = translate.PatternPool()
+    allowlist = gitleaks.Allowlist(stopwords=["example", "test"], paths=["vendor/.*"])
+    copy = gitleaks.Allowlist(stopwords=["".join(["exam", "ple"]), "test"], paths=["vendor/.*"])
+
+    first = translate.translate_allowlist(allowlist, pool)
+    second = translate.translate_allowlist(copy, pool)
+
+    assert copy.stopwords[0] is not allowlist.stopwords[0]
+    assert first.target_strings == second.target_strings == ["example", "test"]
+    assert all(a is b for a, b in zip(first.target_strings, second.target_strings))
+    assert pool.string_count == 6
+    assert pool.unique_string_count == 3
+    assert translate.dedupe_ratio(pool.string_count, pool.unique_string_count) == 2.0
+
+
+def test_share_filters():
+    """Test that identical dumped filters point at the same object."""
+    config = gitleaks.Config(
+        rules=[
+            gitleaks.Rule(
+                id=f"rule{i}",
+                regex=f"pattern{i}",
+                allowlists=[gitleaks.Allowlist(stopwords=["example"])],
+            )
+            for i in range(2)
+        ]
+    )
+
+    data = translate.translate_config(config).model_dump(mode="json", exclude_none=True)
+    data = sssig.share_filters(data)
+
+    first, second = (rule["filters"][0] for rule in data["rules"])
+    assert first is second
+    assert first["target_strings"] == ["example"]
+
+
+def new_example_rule(pattern: str, positive: list[str], **target) -> sssig.Rule:
+    return sssig.Rule(
+        id=translate.generate_sssig_id(pattern),
+        meta=sssig.RuleMeta(name=pattern, examples=sssig.Examples(positive=positive)),
+        target=sssig.Target(pattern=pattern, **target),
+    )
+
+
+def test_optimize_rules():
+    """Test that optimized targets keep their flags and the target group."""
+    rules = sssig.Rules(rules=[
+        new_example_rule(r"[a-z]+", ["KEY=abc"], prefix_pattern=r"(?i)(?:key|kex)="),
+        new_example_rule(r"[0-9]+", ["id 12"]),
+    ])
+
+    optimized, summary = translate.optimize_rules(rules)
+
+    assert optimized.rules[0].target == sssig.Target(
+        prefix_pattern=r"(?i:(?:key|kex)=)", pattern=r"(?i:[a-z]+)"
+    )
+    assert optimized.rules[1] == rules.rules[1]
+    assert summary.optimized == 1
+    assert summary.reverted == []
+
+
+def test_optimize_rules_reverts_on_mismatch(monkeypatch):
+    """Test that a rule keeps its patterns if the rewrite changes them for python."""
+    monkeypatch.setattr(translate.regrp, "scope_flags", lambda regexp: regexp.replace("+", "{2}"))
+    rules = sssig.Rules(rules=[new_example_rule(r"[0-9]+", [])])
+
+    optimized, summary = translate.optimize_rules(rules)
+
+    assert optimized == rules
+    assert summary.reverted == [rules.rules[0].id]
+
+
+def test_try_translate_rule():
+    """Test that a rule that can't be translated returns why."""
+    rule = gitleaks.Rule(id="no-group", regex="abc", secretGroup=2)
+
+    failure = translate.try_translate_rule(rule)
+
+    assert failure == gitleaks.RuleFailure(rule_id="no-group", reason="could not find group")
+    assert translate.try_translate_rule(gitleaks.Rule(id="ok", regex="abc")).target.pattern == "abc"
+
+
+def test_optimize_fixture_rules_are_equivalent():
+    """Test that every fixture rule keeps its python pattern when optimized."""
+    with open("tests/fixtures/gitleaks_8.27.0.toml", "rb") as fp:
+        rules = translate.translate_config(gitleaks.load(fp))
+
+    optimized, summary = translate.optimize_rules(rules)
+
+    assert len(optimized.rules) == len(rules.rules)
+    assert summary.optimized > 0
+    assert summary.reverted == []
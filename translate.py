@@ -3,11 +3,14 @@ Translate Gitleaks rules to SSSIG format.
 """
 import hashlib
 import base64
-import re
-from re import _parser as re_parser
+import sys
+from pathlib import Path
+from lark.exceptions import LarkError
+from pydantic import BaseModel
 from regrp import split_regexp
 
 import gitleaks
+import regrp
 import sssig
 
 
@@ -26,6 +29,48 @@ def generate_sssig_id(gitleaks_id: str) -> str:
     return f"S3IG{b32[:16]}"
 
 
+class PatternPool:
+    """
+    Intern patterns and strings shared across rules and allowlists.
+
+    Identical strings resolve to the same object, and the counts are kept
+    so the dedupe ratio can be reported. Lists are copied when the models
+    validate them, so shared lists are left to sssig's share_filters.
+    """
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+        self.string_count = 0
+
+    @property
+    def unique_string_count(self) -> int:
+        return len(self._strings)
+
+    def string(self, value: str | None) -> str | None:
+        """Return the shared copy of a pattern or string."""
+        if value is None:
+            return None
+
+        self.string_count += 1
+        shared = self._strings.get(value)
+        if shared is None:
+            shared = self._strings[value] = sys.intern(value)
+
+        return shared
+
+    def strings(self, values: list[str] | None) -> list[str] | None:
+        """Return a list of the shared copies of patterns or strings."""
+        if values is None:
+            return None
+
+        return [self.string(value) for value in values]
+
+
+def dedupe_ratio(total: int, unique: int) -> float:
+    """Ratio of total to unique items (1.0 means nothing was shared)."""
+    return total / unique if unique else 1.0
+
+
 def split_regex(regex: str, secret_group: int = 0) -> tuple[str | None, str, str | None]:
     """
     Split a gitleaks regex into prefix, target, and suffix based on the capture group.
@@ -41,32 +86,59 @@ def split_regex(regex: str, secret_group: int = 0) -> tuple[str | None, str, str
     return prefix or None, target, suffix or None
 
 
-def translate_allowlist(allowlist: gitleaks.Allowlist) -> sssig.ExcludeFilter:
+def translate_allowlist(
+    allowlist: gitleaks.Allowlist, pool: PatternPool | None = None
+) -> sssig.ExcludeFilter:
     """
     Translate a Gitleaks allowlist to an SSSIG ExcludeFilter.
     """
+    pool = pool or PatternPool()
     filter_data = {
         "kind": sssig.FilterKind.EXCLUDE,
-        "target_strings": allowlist.stopwords,
-        "path_patterns": allowlist.paths,
+        "target_strings": pool.strings(allowlist.stopwords),
+        "path_patterns": pool.strings(allowlist.paths),
     }
 
     # Map regexes based on regexTarget
-    if allowlist.regexes:
+    if allowlist.regexes and allowlist.regexTarget:
+        regexes = pool.strings(allowlist.regexes)
         if allowlist.regexTarget == gitleaks.RegexTarget.LINE:
-            filter_data["context_patterns"] = allowlist.regexes
+            filter_data["context_patterns"] = regexes
         elif allowlist.regexTarget == gitleaks.RegexTarget.MATCH:
-            filter_data["match_patterns"] = allowlist.regexes
+            filter_data["match_patterns"] = regexes
         elif allowlist.regexTarget == gitleaks.RegexTarget.SECRET:
-            filter_data["target_patterns"] = allowlist.regexes
+            filter_data["target_patterns"] = regexes
 
     return sssig.ExcludeFilter(**filter_data)
 
 
-def translate_rule(rule: gitleaks.Rule) -> sssig.Rule:
+# Filter fields translated rules take from the pool
+_POOLED_FIELDS = ("target_strings", "path_patterns", "context_patterns", "match_patterns", "target_patterns")
+
+
+def intern_rule(rule: sssig.Rule, pool: PatternPool) -> sssig.Rule:
+    """
+    Share the patterns and strings of a rule translated with another pool,
+    like in a worker process, through this one.
+    """
+    target = rule.target
+    target.prefix_pattern = pool.string(target.prefix_pattern)
+    target.pattern = pool.string(target.pattern)
+    target.suffix_pattern = pool.string(target.suffix_pattern)
+    for f in rule.filters or ():
+        for name in _POOLED_FIELDS:
+            if getattr(f, name, None) is not None:
+                setattr(f, name, pool.strings(getattr(f, name)))
+
+    return rule
+
+
+def translate_rule(rule: gitleaks.Rule, pool: PatternPool | None = None) -> sssig.Rule:
     """
     Translate a Gitleaks rule to an SSSIG rule.
     """
+    pool = pool or PatternPool()
+
     # Generate SSSIG ID
     sssig_id = generate_sssig_id(rule.id)
 
@@ -79,13 +151,13 @@ def translate_rule(rule: gitleaks.Rule) -> sssig.Rule:
             raise ValueError(f"Rule {rule.id} has neither regex nor path pattern")
     else:
         # Split the regex pattern
-        prefix, target, suffix = split_regex(rule.regex)
+        prefix, target, suffix = split_regex(rule.regex, rule.secretGroup or 0)
 
     # Create target
     target_obj = sssig.Target(
-        prefix_pattern=prefix,
-        pattern=target,
-        suffix_pattern=suffix,
+        prefix_pattern=pool.string(prefix),
+        pattern=pool.string(target),
+        suffix_pattern=pool.string(suffix),
     )
 
     # Create meta
@@ -110,13 +182,13 @@ def translate_rule(rule: gitleaks.Rule) -> sssig.Rule:
     if rule.path is not None:
         filters.append(sssig.RequireFilter(
             kind=sssig.FilterKind.REQUIRE,
-            path_patterns=[rule.path],
+            path_patterns=pool.strings([rule.path]),
         ))
 
     # Translate allowlists to exclude filters
     if rule.allowlists:
         for allowlist in rule.allowlists:
-            filters.append(translate_allowlist(allowlist))
+            filters.append(translate_allowlist(allowlist, pool))
 
     # Create dependencies
     dependencies = None
@@ -140,10 +212,103 @@ def translate_rule(rule: gitleaks.Rule) -> sssig.Rule:
     )
 
 
-def translate_config(config: gitleaks.Config) -> sssig.Rules:
+class TranslateReport(BaseModel):
+    translated: int
+    failures: list[gitleaks.RuleFailure]
+
+
+def try_translate_rule(
+    rule: gitleaks.Rule, pool: PatternPool | None = None
+) -> sssig.Rule | gitleaks.RuleFailure:
+    """
+    Translate a rule, returning why it failed instead of raising.
+    """
+    try:
+        return translate_rule(rule, pool)
+    except (ValueError, LarkError) as err:
+        # pydantic's ValidationError is a ValueError, which covers patterns
+        # hyperscan rejects
+        return gitleaks.RuleFailure(rule_id=rule.id, reason=gitleaks.describe_error(err))
+
+
+def translate_config(config: gitleaks.Config, pool: PatternPool | None = None) -> sssig.Rules:
     """
     Translate a Gitleaks config to SSSIG rules.
     """
+    pool = pool or PatternPool()
     return sssig.Rules(
-        rules=[translate_rule(rule) for rule in config.rules]
+        rules=[translate_rule(rule, pool) for rule in config.rules]
     )
+
+
+class OptimizeSummary(BaseModel):
+    # Rules whose patterns were rewritten
+    optimized: int
+    # Rules kept as they were because python's form of the rewritten
+    # pattern differs from the original
+    reverted: list[str]
+
+
+def _full_pattern(target: sssig.Target) -> str:
+    """A target's whole pattern with the target as a group."""
+    return f"{target.prefix_pattern or ''}({target.pattern}){target.suffix_pattern or ''}"
+
+
+def optimize_target(target: sssig.Target, pool: PatternPool | None = None) -> sssig.Target:
+    """
+    Rewrite a target's patterns with their inline flags scoped.
+
+    The whole pattern is rewritten at once so inline flags in the prefix are
+    carried into the target and suffix, then split around the same group.
+    """
+    pool = pool or PatternPool()
+    regex = regrp.scope_flags(_full_pattern(target))
+    prefix, pattern, suffix = split_regex(regex, regrp.count_groups(target.prefix_pattern or "") + 1)
+
+    return sssig.Target(
+        prefix_pattern=pool.string(prefix),
+        pattern=pool.string(pattern),
+        suffix_pattern=pool.string(suffix),
+    )
+
+
+def optimize_rules(
+    rules: sssig.Rules, pool: PatternPool | None = None
+) -> tuple[sssig.Rules, OptimizeSummary]:
+    """
+    Scope the inline flags of every rule's target patterns.
+
+    Split targets then keep the flags that applied to them. to_python
+    scopes flags the same way, so a rule keeps its original patterns unless
+    both come out the same for python's re.
+    """
+    pool = pool or PatternPool()
+    optimized = []
+    summary = OptimizeSummary(optimized=0, reverted=[])
+
+    for rule in rules.rules:
+        target = optimize_target(rule.target, pool)
+        if target == rule.target:
+            optimized.append(rule)
+            continue
+
+        if regrp.to_python(_full_pattern(target)) != regrp.to_python(_full_pattern(rule.target)):
+            summary.reverted.append(rule.id)
+            optimized.append(rule)
+            continue
+
+        summary.optimized += 1
+        optimized.append(rule.model_copy(update={"target": target}))
+
+    return sssig.Rules(rules=optimized), summary
+
+
+def load_rules(path: Path, default: Path | None = None) -> sssig.Rules:
+    """
+    Load SSSIG rules, translating gitleaks configs on the way.
+    """
+    if path.suffix == ".toml":
+        return translate_config(gitleaks.load_path(path, default))
+
+    with path.open() as fp:
+        return sssig.load(fp)